@@ -0,0 +1,156 @@
+"""
+Caching layer for NASA point queries and reverse-geocoded place names.
+
+Two tiers:
+- Memory: cachetools.TTLCache shared by every worker thread of the process
+- Disk (optional): diskcache.Cache so restarts keep recently fetched data
+
+Keys round coordinates to 2 decimals (~1 km), so repeated frontend
+interactions and neighbouring suggestion candidates share one NASA call.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Hashable, List, Optional, Tuple
+
+from cachetools import TTLCache
+
+logger = logging.getLogger(__name__)
+
+MEMORY_MAXSIZE = 4096
+MEMORY_TTL_SECONDS = 3600
+DISK_TTL_SECONDS = 86400
+
+# Set PLANMYFEST_CACHE_DIR to an empty string to disable the disk tier
+DISK_CACHE_DIR = os.getenv("PLANMYFEST_CACHE_DIR", str(Path.home() / ".planmyfest_cache"))
+
+_memory: TTLCache = TTLCache(maxsize=MEMORY_MAXSIZE, ttl=MEMORY_TTL_SECONDS)
+_memory_lock = threading.Lock()
+
+
+def _open_disk_cache():
+    """Open the disk tier, or return None when disabled or diskcache is missing."""
+    if not DISK_CACHE_DIR:
+        return None
+    try:
+        from diskcache import Cache
+    except ImportError:
+        logger.info("diskcache not installed, NASA point cache is memory-only")
+        return None
+    try:
+        return Cache(DISK_CACHE_DIR)
+    except Exception as e:
+        logger.warning(f"Disk cache unavailable at {DISK_CACHE_DIR}: {e}")
+        return None
+
+
+_disk = _open_disk_cache()
+
+
+def point_cache_key(namespace: str, latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Tuple:
+    """Build the cache key for a point query."""
+    return (namespace, round(latitude, 2), round(longitude, 2), start_date, end_date, tuple(sorted(variables)))
+
+
+def cache_get(key: Hashable) -> Optional[Any]:
+    """Look a key up in memory, then on disk (promoting disk hits to memory)."""
+    with _memory_lock:
+        value = _memory.get(key)
+    if value is not None:
+        return value
+    if _disk is not None:
+        try:
+            value = _disk.get(key)
+        except Exception as e:
+            logger.debug(f"Disk cache read failed: {e}")
+            value = None
+        if value is not None:
+            with _memory_lock:
+                _memory[key] = value
+    return value
+
+
+def cache_set(key: Hashable, value: Any, disk_ttl: int = DISK_TTL_SECONDS) -> None:
+    """Store a value in both tiers."""
+    with _memory_lock:
+        _memory[key] = value
+    if _disk is not None:
+        try:
+            _disk.set(key, value, expire=disk_ttl)
+        except Exception as e:
+            logger.debug(f"Disk cache write failed: {e}")
+
+
+def _for_caller(value: Any, latitude: float, longitude: float) -> Any:
+    """Shallow copy of a cached point result carrying the caller's own coordinates.
+
+    Keys are rounded, so a hit may have been fetched for a nearby point; the copy keeps
+    callers from seeing that point's location or mutating the cached entry.
+    """
+    if not isinstance(value, dict):
+        return value
+    result = dict(value)
+    if isinstance(result.get("vars"), dict):
+        result["vars"] = dict(result["vars"])
+    if isinstance(result.get("attrs"), dict):
+        result["attrs"] = dict(result["attrs"])
+        if "location" in result["attrs"]:
+            result["attrs"]["location"] = f"({latitude:.4f}°N, {longitude:.4f}°E)"
+    if isinstance(result.get("metadata"), dict):
+        result["metadata"] = dict(result["metadata"])
+        if "location" in result["metadata"]:
+            result["metadata"]["location"] = {"lat": latitude, "lon": longitude}
+    return result
+
+
+def cached_point_query(namespace: str) -> Callable:
+    """Memoize a point getter taking (latitude, longitude, start_date, end_date, variables).
+
+    Works for both plain and async getters; other arguments (e.g. an HTTP
+    session) are not part of the key. Failures are never cached. Callers get a
+    copy stamped with their own coordinates, never the cached object itself.
+    """
+    def decorator(fn: Callable) -> Callable:
+        sig = inspect.signature(fn)
+
+        def bind(args, kwargs):
+            bound = sig.bind(*args, **kwargs).arguments
+            key = point_cache_key(
+                namespace,
+                bound["latitude"],
+                bound["longitude"],
+                bound["start_date"],
+                bound["end_date"],
+                bound["variables"],
+            )
+            return key, bound["latitude"], bound["longitude"]
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                key, latitude, longitude = bind(args, kwargs)
+                cached = cache_get(key)
+                if cached is not None:
+                    return _for_caller(cached, latitude, longitude)
+                value = await fn(*args, **kwargs)
+                cache_set(key, value)
+                return _for_caller(value, latitude, longitude)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key, latitude, longitude = bind(args, kwargs)
+            cached = cache_get(key)
+            if cached is not None:
+                return _for_caller(cached, latitude, longitude)
+            value = fn(*args, **kwargs)
+            cache_set(key, value)
+            return _for_caller(value, latitude, longitude)
+        return wrapper
+
+    return decorator
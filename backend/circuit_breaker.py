@@ -0,0 +1,109 @@
+"""
+Process-wide circuit breakers for NASA data providers.
+
+After `fail_max` consecutive failures a provider's circuit opens and calls
+fail fast with CircuitOpenError for `reset_timeout` seconds, so requests skip
+straight to the next fallback instead of each waiting out a dead backend.
+After the timeout the circuit is half-open: exactly one trial call is let
+through while every other caller keeps failing fast. Success closes the
+circuit, failure re-opens it for another `reset_timeout`.
+"""
+from __future__ import annotations
+
+import functools
+import inspect
+import logging
+import threading
+import time
+from typing import Callable, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose circuit is open."""
+
+
+class CircuitBreaker:
+    """Decorator guarding a sync or async provider function."""
+
+    def __init__(self, name: str, fail_max: int = 5, reset_timeout: float = 60.0,
+                 exclude: Tuple[Type[BaseException], ...] = (),
+                 is_excluded: Optional[Callable[[BaseException], bool]] = None):
+        self.name = name
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        # Exceptions that signal a bad request rather than an unhealthy provider,
+        # by type or (for e.g. HTTP 4xx errors) by inspecting the instance
+        self.exclude = exclude
+        self.is_excluded = is_excluded
+        self._failures = 0
+        self._opened_at = 0.0
+        # Set while the single half-open trial call is running
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def _rejects_calls(self) -> bool:
+        """Caller must hold the lock."""
+        if self._failures < self.fail_max:
+            return False
+        return self._trial_in_flight or time.monotonic() - self._opened_at < self.reset_timeout
+
+    @property
+    def is_open(self) -> bool:
+        with self._lock:
+            return self._rejects_calls()
+
+    def _before_call(self) -> bool:
+        """Raise if the circuit rejects the call; return True if this call is the half-open trial."""
+        with self._lock:
+            if self._rejects_calls():
+                raise CircuitOpenError(f"{self.name} circuit open, skipping provider")
+            if self._failures >= self.fail_max:
+                # Half-open: this caller takes the trial slot, everyone else fails fast until it settles
+                self._trial_in_flight = True
+                return True
+            return False
+
+    def _record(self, error: BaseException | None, trial: bool) -> None:
+        with self._lock:
+            if trial:
+                self._trial_in_flight = False
+            if error is None:
+                self._failures = 0
+                return
+            # Cancellation and excluded errors free the trial slot without settling the circuit
+            if not isinstance(error, Exception):
+                return
+            if isinstance(error, self.exclude) or (self.is_excluded is not None and self.is_excluded(error)):
+                return
+            self._failures += 1
+            if self._failures >= self.fail_max:
+                self._opened_at = time.monotonic()
+                logger.warning(f"{self.name} circuit opened after {self._failures} consecutive failures")
+
+    def __call__(self, fn: Callable) -> Callable:
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                trial = self._before_call()
+                try:
+                    result = await fn(*args, **kwargs)
+                except BaseException as e:
+                    self._record(e, trial)
+                    raise
+                self._record(None, trial)
+                return result
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            trial = self._before_call()
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as e:
+                self._record(e, trial)
+                raise
+            self._record(None, trial)
+            return result
+        return wrapper
@@ -1,28 +1,49 @@
-from fastapi import FastAPI, HTTPException, Response, Query
-from fastapi.responses import FileResponse
+from fastapi import FastAPI, HTTPException, Request, Response, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from pydantic import BaseModel, Field, model_validator
 import asyncio
-from merra2_data import get_point_data as get_merra_point_data, get_stats_data
-from nasa_power_data import get_point_data as get_power_point_data, get_earthdata_point_data
-from nasa_power_data import get_point_data_daily as get_power_point_data_daily
-from typing import Dict, List, Any, Optional
+from merra2_data import get_point_arrays as get_merra_point_arrays, get_stats_data
+from nasa_power_data import get_point_arrays as get_power_point_arrays, get_earthdata_point_arrays
+from nasa_power_data import get_point_arrays_async as get_power_point_arrays_async
+from typing import Dict, List, Any, Optional, Tuple
 import pandas as pd
+import numpy as np
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 import logging
+import hashlib
+from email.utils import formatdate
 from dotenv import load_dotenv
 import os
-import requests
+import aiohttp
+import orjson
+from cachetools import TTLCache
+from concurrent.futures import ThreadPoolExecutor
+from cache import cache_get, cache_set
 import math
-from datetime import datetime
+import time
+from operator import itemgetter
+from datetime import date, datetime, timedelta
 
 # Load environment variables from .env file
 load_dotenv()
 
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
+class ORJSONNumpyResponse(JSONResponse):
+    """JSON response encoded in C by orjson; NumPy arrays/scalars serialize directly and NaN becomes null."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
+app = FastAPI(default_response_class=ORJSONNumpyResponse)
+
+# Blocking NASA fetches (POWER over requests, MERRA-2 over OPeNDAP) are I/O bound and can each wait
+# out 30 s timeouts plus retries, while hedge losers keep running in the background. The pool serves
+# /stats, /probability, /probability/doy, /weather and /download.csv, so size it for waiting on the network
+_FETCH_POOL = ThreadPoolExecutor(max_workers=int(os.getenv("NASA_FETCH_WORKERS", "32")), thread_name_prefix="nasa")
 
 # CORS middleware to allow requests from the frontend
 app.add_middleware(
@@ -33,6 +54,17 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def open_http_session():
+    # One pooled keep-alive session for all outbound HTTP (NASA POWER, Nominatim)
+    connector = aiohttp.TCPConnector(limit=32, limit_per_host=8, keepalive_timeout=60)
+    app.state.http = aiohttp.ClientSession(connector=connector)
+
+@app.on_event("shutdown")
+async def close_http_session():
+    await app.state.http.close()
+    _FETCH_POOL.shutdown(wait=False, cancel_futures=True)
+
 class WeatherQuery(BaseModel):
     latitude: float
     longitude: float
@@ -46,6 +78,16 @@ class StatsQuery(BaseModel):
     variable: str
     stat: str = "mean"
     freq: str = "1D"
+    # Optional point: aggregate one grid cell's series instead of the global field
+    latitude: Optional[float] = Field(default=None, ge=-90, le=90)
+    longitude: Optional[float] = Field(default=None, ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def _point_needs_both_coordinates(self):
+        # A lone coordinate would silently fall back to the expensive global aggregation
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("latitude and longitude must be given together")
+        return self
 
 class ProbabilityQuery(BaseModel):
     latitude: float
@@ -65,24 +107,98 @@ class DOYProbabilityQuery(BaseModel):
     variables: List[str]
     thresholds: Dict[str, float]
 
-@app.get("/")
-def read_root():
-    # Serve index.html from frontend
+def _load_index_page() -> Optional[tuple[bytes, Dict[str, str]]]:
+    """Read index.html once; tag it so browsers can revalidate with a 304."""
     index_path = Path(__file__).resolve().parents[1] / "frontend" / "index.html"
     try:
-        content = index_path.read_text(encoding="utf-8")
-        return Response(content=content, media_type="text/html")
-    except Exception:
+        content = index_path.read_bytes()
+        mtime = index_path.stat().st_mtime
+    except OSError:
+        return None
+    headers = {
+        "ETag": f'"{hashlib.md5(content).hexdigest()}"',
+        "Last-Modified": formatdate(mtime, usegmt=True),
+        "Cache-Control": "no-cache",
+    }
+    return content, headers
+
+_INDEX_PAGE = _load_index_page()
+
+@app.get("/")
+def read_root(request: Request):
+    # Serve index.html from frontend (read once at startup)
+    if _INDEX_PAGE is None:
         return {"message": "Welcome to the Plan My Fest App"}
+    content, headers = _INDEX_PAGE
+    # Fresh Response per request (cheap) so middleware never mutates shared header lists
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=content, media_type="text/html", headers=headers)
+
+# Point-data providers in order of preference
+_WEATHER_PROVIDERS = [
+    ("NASA POWER", get_power_point_arrays),
+    ("NASA Earthdata Search", get_earthdata_point_arrays),
+    ("NASA MERRA-2", get_merra_point_arrays),
+]
+
+# How long a provider may run before the next one is started alongside it
+_HEDGE_DELAY_SECONDS = 0.5
+
+async def _fetch_hedged(providers: List[tuple], *args, hedge_delay: float = _HEDGE_DELAY_SECONDS):
+    """Run blocking providers in preference order, hedging into the next one while the current is slow.
+
+    A provider is started when every running one has failed, or when hedge_delay passes
+    without any result. Results are taken in preference order: a fallback's data is only
+    returned once every provider ahead of it has failed, so a fast fallback never
+    displaces NASA POWER. Returns (name, result); raises the last error if all fail.
+    """
+    loop = asyncio.get_running_loop()
+    tasks: List[asyncio.Future] = []
+
+    def launch():
+        name, fn = providers[len(tasks)]
+        task = loop.run_in_executor(_FETCH_POOL, fn, *args)
+
+        def log_failure(t, name=name):
+            if not t.cancelled() and t.exception() is not None:
+                logger.warning(f"[ERROR] {name} fetch failed: {str(t.exception())[:100]}...")
+
+        task.add_done_callback(log_failure)
+        tasks.append(task)
+
+    launch()
+    try:
+        while True:
+            for (name, _fn), task in zip(providers, tasks):
+                if not task.done():
+                    break  # a preferred provider is still running
+                if task.exception() is None:
+                    return name, task.result()
+            else:
+                # Everything started so far failed: move on, or give up
+                if len(tasks) == len(providers):
+                    raise tasks[-1].exception()
+                logger.info(f"[RETRY] Trying {providers[len(tasks)][0]} fallback")
+                launch()
+                continue
+            succeeded = any(t.done() and t.exception() is None for t in tasks)
+            can_hedge = len(tasks) < len(providers) and not succeeded
+            pending = [t for t in tasks if not t.done()]
+            done, _ = await asyncio.wait(pending, timeout=hedge_delay if can_hedge else None, return_when=asyncio.FIRST_COMPLETED)
+            if not done and can_hedge:
+                logger.info(f"[HEDGE] Starting {providers[len(tasks)][0]} alongside slower providers")
+                launch()
+    finally:
+        # Losers keep running in their worker threads (results still land in the cache); just drop them
+        for task in tasks:
+            task.cancel()
 
 @app.post("/weather")
 async def get_weather_data_endpoint(query: WeatherQuery):
     try:
-        loop = asyncio.get_event_loop()
-        
         # For 2025 dates, try to get the most recent available data
         # NASA POWER has a lag, so use the most recent complete year for current conditions
-        from datetime import datetime
         query_date = datetime.strptime(query.start_date, '%Y-%m-%d')
         
         # If requesting 2025 data, adjust to use most recent available year
@@ -95,63 +211,27 @@ async def get_weather_data_endpoint(query: WeatherQuery):
             recent_start = query.start_date
             recent_end = query.end_date
         
-        # Try NASA POWER API first (no-auth NASA data)
+        # NASA POWER first (no-auth NASA data), hedging into the fallbacks if it is slow or down
+        logger.info(f"[NASA] Trying NASA POWER for {query.latitude:.2f}°N, {query.longitude:.2f}°E")
         try:
-            logger.info(f"[NASA] Trying NASA POWER for {query.latitude:.2f}°N, {query.longitude:.2f}°E")
-            point_data = await loop.run_in_executor(
-                None,
-                get_power_point_data,
+            source, point_data = await _fetch_hedged(
+                _WEATHER_PROVIDERS,
                 query.latitude,
                 query.longitude,
                 recent_start,
                 recent_end,
-                query.variables
+                query.variables,
             )
-            logger.info("[SUCCESS] NASA POWER fetch successful")
-            validation = _validate_dataset(point_data, query.variables)
-            return {"data": point_data, "success": True, "source": point_data.get('metadata', {}).get('data_source', 'NASA POWER'), "validation": validation}
-        except Exception as power_err:
-            logger.warning(f"[ERROR] NASA POWER fetch failed: {str(power_err)[:100]}...")
-            
-            # Try NASA Earthdata Search API as backup
-            try:
-                logger.info(f"[RETRY] Trying NASA Earthdata Search fallback")
-                point_data = await loop.run_in_executor(
-                    None,
-                    get_earthdata_point_data,
-                    query.latitude,
-                    query.longitude,
-                    recent_start,
-                    recent_end,
-                    query.variables
-                )
-                logger.info("[SUCCESS] NASA Earthdata Search fallback successful")
-                validation = _validate_dataset(point_data, query.variables)
-                return {"data": point_data, "success": True, "source": "NASA Earthdata Search", "validation": validation}
-            except Exception as earthdata_err:
-                logger.warning(f"[ERROR] NASA Earthdata Search also failed: {str(earthdata_err)[:100]}...")
-                
-                # Try NASA MERRA-2 OPeNDAP as final NASA option
-                try:
-                    logger.info(f"[RETRY] Trying NASA MERRA-2 OPeNDAP as last resort")
-                    point_data = await loop.run_in_executor(
-                        None,
-                        get_merra_point_data,
-                        query.latitude,
-                        query.longitude,
-                        recent_start,
-                        recent_end,
-                        query.variables,
-                    )
-                    logger.info("[SUCCESS] NASA MERRA-2 OPeNDAP successful")
-                    validation = _validate_dataset(point_data, query.variables)
-                    return {"data": point_data, "success": True, "source": point_data.get('metadata', {}).get('data_source', 'NASA MERRA-2'), "validation": validation}
-                except Exception as merra_err:
-                    logger.error(f"[ERROR] All NASA data sources failed")
-                    raise HTTPException(
-                        status_code=503, 
-                        detail=f"All NASA data sources temporarily unavailable. Please try again later."
-                    )
+        except Exception:
+            logger.error(f"[ERROR] All NASA data sources failed")
+            raise HTTPException(
+                status_code=503, 
+                detail=f"All NASA data sources temporarily unavailable. Please try again later."
+            )
+        logger.info(f"[SUCCESS] {source} fetch successful")
+        validation = _validate_dataset(point_data, query.variables)
+        source = point_data.get('metadata', {}).get('data_source', source)
+        return ORJSONNumpyResponse({"data": _arrays_to_dict(point_data), "success": True, "source": source, "validation": validation})
         
     except HTTPException:
         raise  # Re-raise HTTP exceptions as-is
@@ -166,13 +246,15 @@ async def get_stats(query: StatsQuery):
         # Run the synchronous get_stats_data function in a separate thread
         loop = asyncio.get_event_loop()
         stats_data = await loop.run_in_executor(
-            None,
+            _FETCH_POOL,
             get_stats_data,
             query.start_date,
             query.end_date,
             query.variable,
             query.freq,
-            query.stat
+            query.stat,
+            query.latitude,
+            query.longitude,
         )
         return {"stats": stats_data}
     except Exception as e:
@@ -180,65 +262,77 @@ async def get_stats(query: StatsQuery):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def _dict_to_dataframe(ds_dict: Dict[str, Any]) -> pd.DataFrame:
-    """Convert xarray Dataset.to_dict() output into a tidy pandas DataFrame indexed by time.
+def _arrays_to_dataframe(arrays: Dict[str, Any]) -> pd.DataFrame:
+    """Convert point arrays from the data layer into a tidy pandas DataFrame indexed by time.
 
-    Expects ds_dict with keys: coords.time.data, data_vars.{var}.data
+    Expects arrays with keys: time (datetime64[ns] array), vars.{var} (1-D arrays)
     """
-    if not ds_dict or "coords" not in ds_dict or "time" not in ds_dict["coords"]:
-        raise ValueError("Malformed dataset dictionary")
-    times = ds_dict["coords"]["time"]["data"]
-    df = pd.DataFrame(index=pd.to_datetime(times))
-    for var, meta in ds_dict.get("data_vars", {}).items():
-        if isinstance(meta, dict) and "data" in meta:
-            data = meta["data"]
-            # Flatten if data is nested
-            if isinstance(data, list) and data and isinstance(data[0], list):
-                # Take first grid cell if present due to nearest selection
-                flat = [row[0] if row else None for row in data]
-                df[var] = flat
-            else:
-                df[var] = data
-    return df
+    if not arrays or "time" not in arrays:
+        raise ValueError("Malformed point arrays")
+    # Zero-copy index over the data layer's datetime64 values - no string parsing
+    index = pd.DatetimeIndex(arrays["time"], copy=False)
+    return pd.DataFrame(arrays.get("vars", {}), index=index, dtype=np.float32)
 
 
-def _probability_exceedance(df: pd.DataFrame, thresholds: Dict[str, float]) -> Dict[str, float]:
-    """Compute percent of time each variable exceeds the given threshold."""
-    probs: Dict[str, float] = {}
-    for var, thr in thresholds.items():
-        if var in df.columns:
-            series = pd.to_numeric(df[var], errors="coerce").dropna()
-            if len(series) == 0:
-                probs[var] = 0.0
-            else:
-                probs[var] = float((series > thr).mean() * 100.0)
-    return probs
+def _arrays_to_dict(arrays: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the xarray-like dictionary shape the frontend expects for /weather responses.
+
+    Values stay NumPy arrays; ORJSONNumpyResponse writes them out without Python lists.
+    """
+    times = np.asarray(arrays["time"], dtype="datetime64[s]")
+    result: Dict[str, Any] = {
+        "coords": {"time": {"dims": ["time"], "data": times}},
+        "data_vars": {var: {"dims": ["time"], "data": values} for var, values in arrays.get("vars", {}).items()},
+        "attrs": arrays.get("attrs", {}),
+    }
+    if "metadata" in arrays:
+        result["metadata"] = arrays["metadata"]
+    return result
 
 
-def _validate_dataset(ds_dict: Dict[str, Any], requested_vars: List[str]) -> Dict[str, Any]:
+def _probability_exceedance(df: pd.DataFrame, thresholds: Dict[str, float]) -> Dict[str, float]:
+    """Compute percent of time each variable exceeds the given threshold."""
+    cols = [var for var in thresholds if var in df.columns]
+    if not cols:
+        return {}
+    arr = df[cols].to_numpy(dtype=np.float32, na_value=np.nan)
+    # Compare in the stored float32 precision: float32(0.1) > 0.1 in float64 would count as an exceedance
+    thrs = np.array([thresholds[var] for var in cols], dtype=arr.dtype)
+    # NaN compares False, so count exceedances over valid samples only
+    n_valid = (~np.isnan(arr)).sum(axis=0)
+    n_exceed = (arr > thrs[None, :]).sum(axis=0)
+    probs = np.where(n_valid > 0, n_exceed * 100.0 / np.maximum(n_valid, 1), 0.0)
+    return dict(zip(cols, probs))
+
+
+_PLAUSIBLE_RANGES = {
+    "T2M": (-90, 60, "T2M outside plausible Celsius range (-90..60)"),
+    "WS10M": (0, 60, "WS10M outside plausible m/s range (0..60)"),
+}
+
+
+def _validate_dataset(arrays: Dict[str, Any], requested_vars: List[str]) -> Dict[str, Any]:
     """Lightweight validation to confirm NASA data fetched and values look reasonable."""
     issues: List[str] = []
     try:
-        times = ds_dict.get("coords", {}).get("time", {}).get("data", [])
-        if not times:
+        times = arrays.get("time")
+        if times is None or len(times) == 0:
             issues.append("Missing or empty time axis")
-        data_vars = ds_dict.get("data_vars", {})
+        data_vars = arrays.get("vars", {})
         for var in requested_vars:
             if var not in data_vars:
                 issues.append(f"Variable {var} missing in dataset")
                 continue
-            series = pd.to_numeric(pd.Series(data_vars[var].get("data", [])), errors="coerce")
-            frac_valid = float(series.notna().mean()) if len(series) else 0.0
+            values = np.asarray(data_vars[var], dtype=np.float64)
+            valid = ~np.isnan(values)
+            frac_valid = float(valid.mean()) if values.size else 0.0
             if frac_valid < 0.5:
                 issues.append(f"Variable {var} has too many missing values ({frac_valid*100:.0f}% valid)")
-            if var == "T2M":
-                vals = series.dropna()
-                if len(vals) and (vals.min() < -90 or vals.max() > 60):
-                    issues.append("T2M outside plausible Celsius range (-90..60)")
-            if var == "WS10M":
-                vals = series.dropna()
-                if len(vals) and (vals.min() < 0 or vals.max() > 60):
-                    issues.append("WS10M outside plausible m/s range (0..60)")
+            if var in _PLAUSIBLE_RANGES and valid.any():
+                low, high, message = _PLAUSIBLE_RANGES[var]
+                vals = values[valid]
+                if vals.min() < low or vals.max() > high:
+                    issues.append(message)
     except Exception as e:
         issues.append(f"Validation error: {e}")
     return {"ok": len(issues) == 0, "issues": issues}
@@ -252,8 +346,8 @@ async def probability_endpoint(query: ProbabilityQuery):
         source = None
         try:
             data = await loop.run_in_executor(
-                None,
-                get_power_point_data,
+                _FETCH_POOL,
+                get_power_point_arrays,
                 query.latitude,
                 query.longitude,
                 query.start_date,
@@ -265,8 +359,8 @@ async def probability_endpoint(query: ProbabilityQuery):
             logger.warning(f"NASA POWER probability fetch failed, trying Earthdata Search: {power_err}")
             try:
                 data = await loop.run_in_executor(
-                    None,
-                    get_earthdata_point_data,
+                    _FETCH_POOL,
+                    get_earthdata_point_arrays,
                     query.latitude,
                     query.longitude,
                     query.start_date,
@@ -277,8 +371,8 @@ async def probability_endpoint(query: ProbabilityQuery):
             except Exception as earthdata_err:
                 logger.warning(f"NASA Earthdata Search probability fetch failed, trying MERRA-2: {earthdata_err}")
                 data = await loop.run_in_executor(
-                    None,
-                    get_merra_point_data,
+                    _FETCH_POOL,
+                    get_merra_point_arrays,
                     query.latitude,
                     query.longitude,
                     query.start_date,
@@ -286,15 +380,32 @@ async def probability_endpoint(query: ProbabilityQuery):
                     query.variables,
                 )
                 source = data.get('metadata', {}).get('data_source', 'NASA MERRA-2')
-        df = _dict_to_dataframe(data)
+        df = _arrays_to_dataframe(data)
         probs = _probability_exceedance(df, query.thresholds)
         validation = {"ok": int(len(df)) > 0, "issues": ([] if int(len(df)) > 0 else ["Empty dataset after fetch"]) }
-        return {"probabilities": probs, "n_samples": int(len(df)), "source": source, "validation": validation}
+        return ORJSONNumpyResponse({"probabilities": probs, "n_samples": len(df), "source": source, "validation": validation})
     except Exception as e:
         logger.error(f"NASA probability computation failed: {e}")
         raise HTTPException(status_code=500, detail=f"NASA probability computation failed: {str(e)}")
 
 
+def _build_doy_windows() -> Dict[tuple, np.ndarray]:
+    """Map every valid (month, day) to the month*100+day codes of its +/- 3 day window.
+
+    Uses leap year 2000 so Feb 29 is included; month*100+day keys (unlike
+    day-of-year) stay aligned across leap and non-leap years.
+    """
+    windows: Dict[tuple, np.ndarray] = {}
+    anchor = date(2000, 1, 1)
+    for offset in range(366):
+        center = anchor + timedelta(days=offset)
+        nearby = [center + timedelta(days=o) for o in range(-3, 4)]
+        windows[(center.month, center.day)] = np.array([d.month * 100 + d.day for d in nearby], dtype=np.int64)
+    return windows
+
+_DOY_WINDOWS = _build_doy_windows()
+
+
 @app.post("/probability/doy")
 async def probability_doy_endpoint(query: DOYProbabilityQuery):
     """Probability of exceeding thresholds on a specific month/day across years.
@@ -303,7 +414,6 @@ async def probability_doy_endpoint(query: DOYProbabilityQuery):
     """
     try:
         # Build a long date range across years around the target DOY (+/- 3 days window)
-        from datetime import date, timedelta
         # Collect all dates of interest across years (exact day)
         dates = [date(y, query.month, query.day) for y in range(query.start_year, query.end_year + 1)]
         start_date = dates[0] - timedelta(days=3)
@@ -313,8 +423,8 @@ async def probability_doy_endpoint(query: DOYProbabilityQuery):
         source = None
         try:
             ds = await loop.run_in_executor(
-                None,
-                get_power_point_data_daily,
+                _FETCH_POOL,
+                get_power_point_arrays,
                 query.latitude,
                 query.longitude,
                 start_date.isoformat(),
@@ -325,8 +435,8 @@ async def probability_doy_endpoint(query: DOYProbabilityQuery):
         except Exception as power_err:
             logger.warning(f"NASA POWER DOY probability failed, trying MERRA-2: {power_err}")
             ds = await loop.run_in_executor(
-                None,
-                get_merra_point_data,
+                _FETCH_POOL,
+                get_merra_point_arrays,
                 query.latitude,
                 query.longitude,
                 start_date.isoformat(),
@@ -335,50 +445,29 @@ async def probability_doy_endpoint(query: DOYProbabilityQuery):
             )
             source = ds.get('metadata', {}).get('data_source', 'NASA MERRA-2')
         
-        df = _dict_to_dataframe(ds)
-        # Filter to rows matching +/- 3 days around target DOY each year - simplified approach
-        df_index = pd.to_datetime(df.index)
-        month_day_match = (df_index.month == query.month) & (df_index.day == query.day)
-        sub = df.loc[month_day_match]
+        df = _arrays_to_dataframe(ds)
+        # Filter to rows matching the target month/day each year
+        # (index is already a DatetimeIndex; month*100+day keys stay aligned across leap years)
+        df_index = df.index
+        md_codes = df_index.month.to_numpy() * 100 + df_index.day.to_numpy()
+        sub = df.loc[md_codes == query.month * 100 + query.day]
         
-        # If we don't have enough samples, expand to nearby days
+        # If we don't have enough samples, expand to +/- 3 days (rolling over month ends correctly)
         if len(sub) < 10:
-            nearby_days = []
-            for offset in [-3, -2, -1, 0, 1, 2, 3]:
-                try:
-                    target_month = query.month
-                    target_day = query.day + offset
-                    if target_day <= 0:
-                        target_month -= 1
-                        target_day += 31  # Approximate
-                    elif target_day > 31:
-                        target_month += 1
-                        target_day -= 31
-                    if 1 <= target_month <= 12 and 1 <= target_day <= 31:
-                        nearby_mask = (df_index.month == target_month) & (df_index.day == target_day)
-                        nearby_days.append(nearby_mask)
-                except:
-                    continue
-            if nearby_days:
-                combined_mask = nearby_days[0]
-                for mask in nearby_days[1:]:
-                    combined_mask = combined_mask | mask
-                sub = df.loc[combined_mask]
+            sub = df.loc[np.isin(md_codes, _DOY_WINDOWS[(query.month, query.day)])]
         
         probs = _probability_exceedance(sub, query.thresholds)
         # Optional summary stats for T2M to answer "How hot would it be?"
         summary = {}
-        if "T2M" in sub.columns and len(sub["T2M"].dropna()) > 0:
-            s = pd.to_numeric(sub["T2M"], errors="coerce").dropna()
-            if len(s) > 0:
-                summary["T2M"] = {
-                    "mean": float(s.mean()),
-                    "median": float(s.median()),
-                    "p10": float(s.quantile(0.10)),
-                    "p90": float(s.quantile(0.90)),
-                }
+        if "T2M" in sub.columns:
+            arr = pd.to_numeric(sub["T2M"], errors="coerce").to_numpy(dtype=np.float64)
+            arr = arr[~np.isnan(arr)]
+            if arr.size:
+                # One sort-based pass for all three quantiles
+                p10, median, p90 = np.quantile(arr, [0.10, 0.5, 0.90])
+                summary["T2M"] = {"mean": arr.mean(), "median": median, "p10": p10, "p90": p90}
         validation = {"ok": int(len(sub)) > 0, "issues": ([] if int(len(sub)) > 0 else ["No matching DOY samples"]) }
-        return {"probabilities": probs, "n_samples": int(len(sub)), "source": source, "validation": validation, "summary": summary}
+        return ORJSONNumpyResponse({"probabilities": probs, "n_samples": len(sub), "source": source, "validation": validation, "summary": summary})
     except Exception as e:
         logger.error(f"NASA DOY Probability computation failed: {e}")
         raise HTTPException(status_code=500, detail=f"NASA DOY probability computation failed: {str(e)}")
@@ -387,7 +476,39 @@ async def probability_doy_endpoint(query: DOYProbabilityQuery):
 # ----------------------------
 # Geocoding proxy endpoints
 # ----------------------------
-NOMINATIM_BASE = "https://nominatim.openstreetmap.org"
+# Point at a self-hosted Nominatim to lift the public instance's rate limit (see NOMINATIM_MIN_INTERVAL)
+NOMINATIM_BASE = os.getenv("NOMINATIM_BASE", "https://nominatim.openstreetmap.org")
+
+# Nominatim results are stable for hours and its usage policy expects clients to cache
+_geocode_cache: TTLCache = TTLCache(maxsize=1024, ttl=86400)
+_reverse_geocode_cache: TTLCache = TTLCache(maxsize=1024, ttl=86400)
+# The public Nominatim policy allows at most 1 request/s, so request *starts* are spaced
+# NOMINATIM_MIN_INTERVAL apart. Responses are never held back: a lone lookup returns after one
+# round trip and N queued lookups take (N-1) intervals plus a round trip. Lower the interval
+# (e.g. to 0) only with a self-hosted NOMINATIM_BASE.
+NOMINATIM_MIN_INTERVAL = float(os.getenv("NOMINATIM_MIN_INTERVAL", "1.0"))
+_nominatim_next_start = 0.0
+_nominatim_lock = asyncio.Lock()
+
+
+async def _nominatim_wait_turn() -> None:
+    """Wait until this process may send its next Nominatim request, and reserve that start time."""
+    global _nominatim_next_start
+    async with _nominatim_lock:
+        now = time.monotonic()
+        start = max(now, _nominatim_next_start)
+        _nominatim_next_start = start + NOMINATIM_MIN_INTERVAL
+    # Sleep outside the lock so later callers can reserve their own slots meanwhile
+    await asyncio.sleep(start - now)
+
+# Suggestion place names change rarely and are kept in the shared memory/disk cache
+PLACE_NAME_TTL_SECONDS = 30 * 86400
+
+
+def _place_name_cache_key(lat: float, lon: float) -> Tuple:
+    """~100 m keys, so neighbouring candidates and repeat searches share one lookup."""
+    return ("place_name", round(lat, 3), round(lon, 3))
+
 
 def _nominatim_headers() -> Dict[str, str]:
     # Provide a clear User-Agent per Nominatim usage policy
@@ -399,7 +520,10 @@ def _nominatim_headers() -> Dict[str, str]:
     }
 
 @app.get("/geocode")
-def geocode_proxy(q: str = Query(..., min_length=2), limit: int = 8):
+async def geocode_proxy(q: str = Query(..., min_length=2), limit: int = 8):
+    key = (q.strip().lower(), limit)
+    if key in _geocode_cache:
+        return _geocode_cache[key]
     try:
         params = {
             "format": "jsonv2",
@@ -407,30 +531,43 @@ def geocode_proxy(q: str = Query(..., min_length=2), limit: int = 8):
             "limit": str(limit),
             "q": q,
         }
-        resp = requests.get(f"{NOMINATIM_BASE}/search", params=params, headers=_nominatim_headers(), timeout=10)
-        resp.raise_for_status()
-        return resp.json()
-    except requests.HTTPError as e:
+        await _nominatim_wait_turn()
+        async with app.state.http.get(
+            f"{NOMINATIM_BASE}/search", params=params, headers=_nominatim_headers(), timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json(loads=orjson.loads)
+        _geocode_cache[key] = data
+        return data
+    except aiohttp.ClientResponseError as e:
         logger.warning(f"[GEOCODE] Nominatim HTTP error: {e}")
-        raise HTTPException(status_code=resp.status_code if 'resp' in locals() else 502, detail="Geocoding failed")
+        raise HTTPException(status_code=e.status, detail="Geocoding failed")
     except Exception as e:
         logger.error(f"[GEOCODE] Proxy error: {e}")
         raise HTTPException(status_code=502, detail="Geocoding service unavailable")
 
 @app.get("/reverse-geocode")
-def reverse_geocode_proxy(lat: float, lon: float):
+async def reverse_geocode_proxy(lat: float, lon: float):
+    key = (round(lat, 5), round(lon, 5))
+    if key in _reverse_geocode_cache:
+        return _reverse_geocode_cache[key]
     try:
         params = {
             "format": "jsonv2",
             "lat": str(lat),
             "lon": str(lon),
         }
-        resp = requests.get(f"{NOMINATIM_BASE}/reverse", params=params, headers=_nominatim_headers(), timeout=10)
-        resp.raise_for_status()
-        return resp.json()
-    except requests.HTTPError as e:
+        await _nominatim_wait_turn()
+        async with app.state.http.get(
+            f"{NOMINATIM_BASE}/reverse", params=params, headers=_nominatim_headers(), timeout=aiohttp.ClientTimeout(total=10)
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json(loads=orjson.loads)
+        _reverse_geocode_cache[key] = data
+        return data
+    except aiohttp.ClientResponseError as e:
         logger.warning(f"[REVERSE] Nominatim HTTP error: {e}")
-        raise HTTPException(status_code=resp.status_code if 'resp' in locals() else 502, detail="Reverse geocoding failed")
+        raise HTTPException(status_code=e.status, detail="Reverse geocoding failed")
     except Exception as e:
         logger.error(f"[REVERSE] Proxy error: {e}")
         raise HTTPException(status_code=502, detail="Reverse geocoding service unavailable")
@@ -440,6 +577,207 @@ def reverse_geocode_proxy(lat: float, lon: float):
 # Nearby weather suggestions endpoint
 # ----------------------------
 
+# Nearby-point variations around the center weather: field, ± spread, never negative
+_VARIATION_FIELDS = ("t2m", "rain", "qv", "ps", "ws", "u10m", "v10m")
+_VARIATION_SPREAD = np.array([
+    1.0,  # Temperature ±1°C
+    0.8,  # Rainfall ±0.8mm
+    0.6,  # Humidity ±0.6 g/kg
+    0.5,  # Pressure ±0.5 kPa
+    0.7,  # Wind speed ±0.7 m/s
+    0.5,  # U wind component ±0.5 m/s
+    0.5,  # V wind component ±0.5 m/s
+])
+_VARIATION_NON_NEGATIVE = np.array([False, True, True, False, True, False, False])
+
+
+# Numeric fields returned per suggestion, and the labelled ones summarised in its reason string
+_SUGGESTION_FIELDS = ("lat", "lon", "t2m", "rain", "qv", "ps", "ws")
+_suggestion_values = itemgetter(*_SUGGESTION_FIELDS)
+_REASON_PARTS = (("Temp", "t2m", "°C"), ("Rain", "rain", "mm"), ("Wind", "ws", "m/s"), ("Humidity", "qv", "g/kg"))
+
+# Columns of the candidate matrix fed to the scorer, and the weight of each subscore
+_SCORE_FIELDS = ("t2m", "rain", "ws", "qv", "ps")
+_SCORE_COLUMNS = [_SUGGESTION_FIELDS.index(field) for field in _SCORE_FIELDS]
+# Candidates missing any of these are dropped before scoring
+_REQUIRED_COLUMNS = [_SUGGESTION_FIELDS.index(field) for field in ("lat", "lon", "t2m", "rain")]
+_SCORE_WEIGHTS = np.array([
+    0.35,  # Temperature is most important
+    0.30,  # Rain significantly affects comfort
+    0.20,  # Wind affects comfort
+    0.10,  # Humidity affects comfort
+    0.05,  # Pressure affects weather stability
+])
+
+
+def _weather_subscores(arr: np.ndarray) -> np.ndarray:
+    """
+    Per-factor weather quality subscores for an (N, 5) matrix of _SCORE_FIELDS:
+    - Temperature comfort (optimal around 22-25°C)
+    - Precipitation (lower is better)
+    - Wind conditions (moderate is best)
+    - Humidity (comfortable range)
+    - Pressure (stability indicator)
+    """
+    t2m, rain, ws, qv, ps = arr.T
+    # Each factor is written straight into its column of one preallocated matrix, using
+    # in-place ufuncs and masked copies instead of nested np.where temporaries
+    subscores = np.empty_like(arr, dtype=np.float64)
+    temp_score, rain_score, wind_score, humidity_score, pressure_score = subscores.T
+
+    # Temperature scoring (peak at 22-25°C): outer range, then the 18-30°C band, then the plateau
+    temp_dev = np.abs(t2m - 23.5)
+    _linear_falloff(temp_dev, 20.0, 0.5, 0.0, out=temp_score)
+    np.copyto(temp_score, 0.8 - temp_dev / 15.0, where=(t2m >= 18) & (t2m <= 30))
+    np.copyto(temp_score, 1.0, where=(t2m >= 22) & (t2m <= 25))
+
+    # Precipitation scoring (exponential decay, 3mm = ~0.37 score)
+    np.divide(rain, -3.0, out=rain_score)
+    np.exp(rain_score, out=rain_score)
+
+    # Wind scoring (optimal around 2-6 m/s, very windy above 10 m/s)
+    _linear_falloff(np.abs(ws - 4), 8.0, 1.0, 0.3, out=wind_score)
+    np.copyto(wind_score, 0.1, where=~(ws < 10))
+    np.copyto(wind_score, 1.0, where=(ws >= 2) & (ws <= 6))
+
+    # Humidity scoring (based on specific humidity in g/kg)
+    _linear_falloff(np.abs(qv - 9), 8.0, 1.0, 0.2, out=humidity_score)
+    np.copyto(humidity_score, 1.0, where=(qv >= 6) & (qv <= 12))
+
+    # Pressure scoring (stability indicator)
+    _linear_falloff(np.abs(ps - 101.3), 5.0, 1.0, 0.5, out=pressure_score)
+    return subscores
+
+
+def _linear_falloff(dev: np.ndarray, scale: float, peak: float, floor: float, out: np.ndarray) -> np.ndarray:
+    """out = max(floor, peak - dev / scale), computed in place."""
+    np.divide(dev, -scale, out=out)
+    out += peak
+    return np.fmax(out, floor, out=out)
+
+
+def _score_weather_arrays(arr: np.ndarray) -> np.ndarray:
+    """Weighted weather quality score in [0, 1] for each row of an (N, 5) candidate matrix."""
+    final_score = _weather_subscores(arr) @ _SCORE_WEIGHTS
+    # Clamp and zero out NaN in place on the one result array
+    np.clip(final_score, 0.0, 1.0, out=final_score)
+    return np.nan_to_num(final_score, copy=False, nan=0.0)
+
+# Variables fetched per suggestion point - optimized for weather quality assessment
+_SUGGESTION_VARIABLES = ["T2M", "PRECTOTCORR", "QV2M", "PS", "WS10M", "U10M", "V10M"]
+
+
+def _first_day_weather(ds: Dict[str, Any]) -> Optional[Dict[str, float]]:
+    """Suggestion fields from the first time step of point arrays, filling gaps with typical values."""
+    if len(ds.get("time", ())) == 0:
+        return None
+    data_vars = ds.get("vars", {})
+
+    def safe_get(key, default):
+        try:
+            val = float(data_vars[key][0])
+        except (KeyError, IndexError, TypeError, ValueError):
+            return default
+        return default if math.isnan(val) else val
+
+    weather = {
+        "t2m": safe_get("T2M", 20.0),
+        "rain": safe_get("PRECTOTCORR", 0.0),
+        "qv": safe_get("QV2M", 8.0),
+        "ps": safe_get("PS", 101.3),
+        "u10m": safe_get("U10M", 0.0),
+        "v10m": safe_get("V10M", 0.0),
+    }
+    # Calculate wind speed from components
+    if not math.isnan(weather["u10m"]) and not math.isnan(weather["v10m"]):
+        weather["ws"] = math.sqrt(weather["u10m"]**2 + weather["v10m"]**2)
+    else:
+        weather["ws"] = safe_get("WS10M", 3.0)
+    return weather
+
+
+async def _fetch_point_weather(session: aiohttp.ClientSession, lat: float, lon: float, day: str) -> Dict[str, Any]:
+    """Fetch weather for a suggestion point: NASA POWER, then climatology, then latitude-based defaults."""
+    result = {
+        "lat": lat, "lon": lon,
+        "t2m": float('nan'), "rain": float('nan'), "qv": float('nan'),
+        "ps": float('nan'), "ws": float('nan'), "u10m": float('nan'), "v10m": float('nan'),
+        "source": "Unknown", "error": None
+    }
+
+    # Try NASA POWER API first
+    try:
+        ds = await get_power_point_arrays_async(session, lat, lon, day, day, _SUGGESTION_VARIABLES)
+        weather = _first_day_weather(ds)
+        if weather is not None:
+            result.update(weather, source=ds.get('attrs', {}).get('source', 'NASA POWER API'))
+            return result
+    except Exception as e:
+        logger.debug(f"NASA POWER failed for ({lat:.4f}, {lon:.4f}): {e}")
+        result["error"] = str(e)
+
+    # Fallback to climatological data
+    try:
+        ds = get_earthdata_point_arrays(lat, lon, day, day, _SUGGESTION_VARIABLES)
+        weather = _first_day_weather(ds)
+        if weather is not None:
+            result.update(weather, source=ds.get('attrs', {}).get('source', 'NASA Climatological Patterns'))
+    except Exception as e2:
+        logger.debug(f"Climatological fallback failed for ({lat:.4f}, {lon:.4f}): {e2}")
+        # Use basic defaults based on location
+        result.update({
+            "t2m": 20.0 - abs(lat) * 0.3,  # Cooler at higher latitudes
+            "rain": 1.0,  # Light rain assumption
+            "qv": 8.0,   # Moderate humidity
+            "ps": 101.3 - abs(lat) * 0.1,  # Pressure variation
+            "ws": 3.0,   # Gentle breeze
+            "source": "Default estimates"
+        })
+
+    return result
+
+
+async def _get_location_name(session: aiohttp.ClientSession, lat: float, lon: float) -> str:
+    """Get human-readable location name for a suggestion, via the place-name cache or Nominatim."""
+    key = _place_name_cache_key(lat, lon)
+    cached = cache_get(key)
+    if cached is not None:
+        return cached
+    try:
+        params = {
+            "format": "jsonv2",
+            "lat": str(lat),
+            "lon": str(lon),
+            "zoom": "14",  # Appropriate zoom level for neighborhoods
+        }
+        await _nominatim_wait_turn()
+        async with session.get(
+            f"{NOMINATIM_BASE}/reverse",
+            params=params,
+            headers=_nominatim_headers(),
+            timeout=aiohttp.ClientTimeout(total=5)
+        ) as resp:
+            resp.raise_for_status()
+            data = await resp.json(loads=orjson.loads)
+        # Try to get a meaningful location name
+        display_name = data.get("display_name", "")
+        if display_name:
+            # Simplify the display name
+            parts = display_name.split(",")
+            if len(parts) >= 2:
+                name = f"{parts[0].strip()}, {parts[1].strip()}"
+            else:
+                name = parts[0].strip()
+        else:
+            name = data.get("name", f"{lat:.4f}, {lon:.4f}")
+        cache_set(key, name, disk_ttl=PLACE_NAME_TTL_SECONDS)
+        return name
+    except Exception as e:
+        logger.debug(f"Reverse geocoding failed for ({lat}, {lon}): {e}")
+
+    return f"{lat:.4f}, {lon:.4f}"
+
+
 @app.get("/weather-suggestions")
 async def weather_suggestions(
     latitude: float,
@@ -464,7 +802,6 @@ async def weather_suggestions(
 
         # Improved grid generation for better area coverage
         # Create a more dense grid pattern for thorough coverage
-        num_rings = 3  # Concentric rings around center
         points_per_ring = [1, 8, 16]  # Center, inner ring, outer ring
         
         # Calculate degree conversions
@@ -472,355 +809,137 @@ async def weather_suggestions(
         # Adjust longitude conversion based on latitude to account for Earth's curvature
         lon_deg_per_km = 1.0 / (111.0 * max(0.1, math.cos(math.radians(latitude))))
         
-        candidates = []
+        # Concentric rings around the center, evenly spaced in angle
+        ring_angles = [np.linspace(0.0, 2 * np.pi, n, endpoint=False) for n in points_per_ring[1:]]
+        ring_dists = [
+            np.full(n, (radius_km * ring_idx) / len(points_per_ring))
+            for ring_idx, n in enumerate(points_per_ring[1:], 1)
+        ]
         
-        # Add center point
-        candidates.append((latitude, longitude, 0.0))
+        # Random scattered points within radius for better coverage (deterministic per center)
+        rng = np.random.default_rng(int(latitude * 1000 + longitude * 1000) & 0xFFFFFFFF)
+        n_scatter = min(10, max(5, limit))
+        scatter_angles = rng.uniform(0.0, 2 * np.pi, n_scatter)
+        scatter_dists = rng.uniform(0.0, radius_km, n_scatter)
         
-        # Add points in concentric rings
-        for ring_idx, num_points in enumerate(points_per_ring[1:], 1):
-            ring_radius_km = (radius_km * ring_idx) / len(points_per_ring)
-            
-            for i in range(num_points):
-                # Calculate angle for even distribution
-                angle = (2 * math.pi * i) / num_points
-                
-                # Convert to lat/lon offsets
-                lat_offset = ring_radius_km * math.cos(angle) * lat_deg_per_km
-                lon_offset = ring_radius_km * math.sin(angle) * lon_deg_per_km
-                
-                new_lat = latitude + lat_offset
-                new_lon = longitude + lon_offset
-                
-                # Check bounds and distance
-                if -90 <= new_lat <= 90 and -180 <= new_lon <= 180:
-                    distance = ring_radius_km
-                    if distance <= radius_km:
-                        candidates.append((new_lat, new_lon, distance))
-
-        # Add random scattered points for better coverage
-        import random
-        random.seed(int(latitude * 1000 + longitude * 1000))  # Deterministic randomness
-        for _ in range(min(10, max(5, limit))):
-            # Random point within radius
-            angle = random.uniform(0, 2 * math.pi)
-            distance = random.uniform(0, radius_km)
-            
-            lat_offset = distance * math.cos(angle) * lat_deg_per_km
-            lon_offset = distance * math.sin(angle) * lon_deg_per_km
-            
-            new_lat = latitude + lat_offset
-            new_lon = longitude + lon_offset
-            
-            if -90 <= new_lat <= 90 and -180 <= new_lon <= 180:
-                candidates.append((new_lat, new_lon, distance))
-
-        # Remove duplicates and sort by distance
-        unique_candidates = []
-        seen = set()
-        for lat, lon, dist in candidates:
-            key = (round(lat, 4), round(lon, 4))
-            if key not in seen:
-                seen.add(key)
-                unique_candidates.append((lat, lon, dist))
+        # Center first, then rings, then scatter - all offsets in one vectorized pass
+        angles = np.concatenate([[0.0], *ring_angles, scatter_angles])
+        dists = np.concatenate([[0.0], *ring_dists, scatter_dists])
+        lats = latitude + dists * np.cos(angles) * lat_deg_per_km
+        lons = longitude + dists * np.sin(angles) * lon_deg_per_km
         
-        candidates = sorted(unique_candidates, key=lambda x: x[2])[:20]  # Limit to 20 candidates
-
-        # Variables to fetch - optimized for weather quality assessment
-        variables = ["T2M", "PRECTOTCORR", "QV2M", "PS", "WS10M", "U10M", "V10M"]
-
-        def fetch_point_with_fallback(lat, lon):
-            """Fetch weather data with improved fallback strategy"""
-            result = {
-                "lat": lat, "lon": lon,
-                "t2m": float('nan'), "rain": float('nan'), "qv": float('nan'),
-                "ps": float('nan'), "ws": float('nan'), "u10m": float('nan'), "v10m": float('nan'),
-                "source": "Unknown", "error": None
-            }
-            
-            # Try NASA POWER API first
+        # Check bounds (the center point is always kept)
+        keep = (lats >= -90) & (lats <= 90) & (lons >= -180) & (lons <= 180)
+        keep[0] = True
+        lats, lons, dists = lats[keep], lons[keep], dists[keep]
+
+        # Remove duplicates (4-decimal grid, packed into one uint64 key per point) and sort by distance
+        lat_q = np.rint((lats + 90.0) * 1e4).astype(np.uint64)
+        lon_q = np.rint((lons + 180.0) * 1e4).astype(np.uint64)
+        _, first_idx = np.unique((lat_q << np.uint64(32)) | lon_q, return_index=True)
+        first_idx = np.sort(first_idx)  # back to generation order so ties keep it
+        order = first_idx[np.argsort(dists[first_idx], kind="stable")][:20]  # Limit to 20 candidates
+
+        # Only the center point hits NASA; nearby candidates are derived from it,
+        # so there is nothing to batch or throttle once the baseline is in.
+        center_weather = await _fetch_point_weather(app.state.http, latitude, longitude, date)
+
+        # Create realistic variations of the center weather for all nearby points in one PRNG draw.
+        # Seeding from the candidates' lat/lon keeps variations consistent for the same locations.
+        cand_lats = lats[order]
+        cand_lons = lons[order]
+        nearby = ~((cand_lats == latitude) & (cand_lons == longitude))
+        seeds = (np.trunc(cand_lats[nearby] * 1000 + cand_lons[nearby] * 1000).astype(np.int64) & 0xFFFFFFFF).tolist()
+        base = np.array([center_weather[field] for field in _VARIATION_FIELDS], dtype=np.float64)
+        # One generator per location so its variation does not depend on which other candidates are present
+        offsets = [np.random.default_rng(seed).uniform(-_VARIATION_SPREAD, _VARIATION_SPREAD) for seed in seeds]
+        varied = base + np.array(offsets, dtype=np.float64).reshape(-1, len(_VARIATION_FIELDS))
+        # Rain, humidity and wind speed are never negative
+        np.fmax(varied, 0.0, out=varied, where=_VARIATION_NON_NEGATIVE)
+
+        variation_source = f"Variation of {center_weather['source']}"
+        results = [center_weather.copy() for _ in range(int((~nearby).sum()))] + [
+            {"lat": lat2, "lon": lon2, **dict(zip(_VARIATION_FIELDS, row)), "source": variation_source, "error": None}
+            for lat2, lon2, row in zip(cand_lats[nearby].tolist(), cand_lons[nearby].tolist(), varied.tolist())
+        ]
+
+        # Stack every candidate once: JSON-safe values (NaN -> None) and the scoring matrix come from it
+        values = np.array([_suggestion_values(r) for r in results], dtype=np.float64)
+
+        # Only candidates with the headline fields present are worth scoring
+        valid = ~np.isnan(values[:, _REQUIRED_COLUMNS]).any(axis=1)
+        valid_idx = np.flatnonzero(valid)
+        results = [results[i] for i in valid_idx.tolist()]
+        values = values[valid_idx]
+
+        safe_values = np.where(np.isnan(values), None, values.astype(object)).tolist()
+        scores = _score_weather_arrays(values[:, _SCORE_COLUMNS])
+        rounded_scores = np.round(scores, 3)
+
+        # Pick the top `limit` candidates without fully sorting, then order just those (highest first)
+        k = min(limit, len(scores))
+        ranking = np.argpartition(-scores, k - 1)[:k] if k else valid_idx[:0]
+        ranking = ranking[np.argsort(-scores[ranking], kind="stable")]
+
+        # Build the top results (already in rank order) with proper error handling
+        top = []
+        for i in ranking.tolist():
+            r = results[i]
             try:
-                ds = get_power_point_data_daily(lat, lon, date, date, variables)
-                source = ds.get('attrs', {}).get('source', 'NASA POWER API')
-                df = _dict_to_dataframe(ds)
-                
-                if len(df) > 0:
-                    today_val = df.iloc[0] if len(df) > 0 else {}
-                    
-                    def safe_get(key, default=float('nan')):
-                        try:
-                            val = today_val.get(key, default)
-                            return float(val) if not math.isnan(float(val)) else default
-                        except:
-                            return default
-                    
-                    result.update({
-                        "t2m": safe_get("T2M", 20.0),
-                        "rain": safe_get("PRECTOTCORR", 0.0),
-                        "qv": safe_get("QV2M", 8.0),
-                        "ps": safe_get("PS", 101.3),
-                        "u10m": safe_get("U10M", 0.0),
-                        "v10m": safe_get("V10M", 0.0),
-                        "source": source
-                    })
-                    
-                    # Calculate wind speed from components
-                    if not math.isnan(result["u10m"]) and not math.isnan(result["v10m"]):
-                        result["ws"] = math.sqrt(result["u10m"]**2 + result["v10m"]**2)
-                    else:
-                        result["ws"] = safe_get("WS10M", 3.0)
-                    
-                    return result
-                    
-            except Exception as e:
-                logger.debug(f"NASA POWER failed for ({lat:.4f}, {lon:.4f}): {e}")
-                result["error"] = str(e)
-            
-            # Fallback to climatological data
-            try:
-                ds = get_earthdata_point_data(lat, lon, date, date, variables)
-                source = ds.get('attrs', {}).get('source', 'NASA Climatological Patterns')
-                df = _dict_to_dataframe(ds)
-                
-                if len(df) > 0:
-                    today_val = df.iloc[0]
-                    
-                    def safe_get(key, default=float('nan')):
-                        try:
-                            val = today_val.get(key, default)
-                            return float(val) if not math.isnan(float(val)) else default
-                        except:
-                            return default
-                    
-                    result.update({
-                        "t2m": safe_get("T2M", 20.0),
-                        "rain": safe_get("PRECTOTCORR", 0.0),
-                        "qv": safe_get("QV2M", 8.0),
-                        "ps": safe_get("PS", 101.3),
-                        "u10m": safe_get("U10M", 0.0),
-                        "v10m": safe_get("V10M", 0.0),
-                        "source": source
-                    })
-                    
-                    # Calculate wind speed
-                    if not math.isnan(result["u10m"]) and not math.isnan(result["v10m"]):
-                        result["ws"] = math.sqrt(result["u10m"]**2 + result["v10m"]**2)
-                    else:
-                        result["ws"] = safe_get("WS10M", 3.0)
-                        
-            except Exception as e2:
-                logger.debug(f"Climatological fallback failed for ({lat:.4f}, {lon:.4f}): {e2}")
-                # Use basic defaults based on location
-                result.update({
-                    "t2m": 20.0 - abs(lat) * 0.3,  # Cooler at higher latitudes
-                    "rain": 1.0,  # Light rain assumption
-                    "qv": 8.0,   # Moderate humidity
-                    "ps": 101.3 - abs(lat) * 0.1,  # Pressure variation
-                    "ws": 3.0,   # Gentle breeze
-                    "source": "Default estimates"
-                })
-            
-            return result
-
-        # Fetch all points with proper concurrency control
-        loop = asyncio.get_event_loop()
-        results = []
-        
-        # First, get the weather data for the main center point to use as baseline
-        center_weather = await loop.run_in_executor(None, fetch_point_with_fallback, latitude, longitude)
-        
-        # Process in small batches to avoid overwhelming the API
-        batch_size = 5
-        for i in range(0, len(candidates), batch_size):
-            batch = candidates[i:i + batch_size]
-            batch_results = []
-            
-            for (lat2, lon2, distance) in batch:
-                if lat2 == latitude and lon2 == longitude:
-                    # This is the center point, use actual data
-                    res = center_weather.copy()
-                else:
-                    # For nearby points, create realistic variations based on center point
-                    import random
-                    # Use lat/lon as seed for consistent variations for same location
-                    random.seed(int((lat2 * 1000) + (lon2 * 1000)))
-                    
-                    # Create variations within ±0.5 to ±1 range for each parameter
-                    res = {
-                        "lat": lat2, 
-                        "lon": lon2,
-                        "t2m": center_weather["t2m"] + random.uniform(-1.0, 1.0),  # Temperature ±1°C
-                        "rain": max(0, center_weather["rain"] + random.uniform(-0.8, 0.8)),  # Rainfall ±0.8mm (never negative)
-                        "qv": max(0, center_weather["qv"] + random.uniform(-0.6, 0.6)),  # Humidity ±0.6 g/kg
-                        "ps": center_weather["ps"] + random.uniform(-0.5, 0.5),  # Pressure ±0.5 kPa
-                        "ws": max(0, center_weather["ws"] + random.uniform(-0.7, 0.7)),  # Wind speed ±0.7 m/s (never negative)
-                        "u10m": center_weather["u10m"] + random.uniform(-0.5, 0.5),  # U wind component ±0.5 m/s
-                        "v10m": center_weather["v10m"] + random.uniform(-0.5, 0.5),  # V wind component ±0.5 m/s
-                        "source": f"Variation of {center_weather['source']}",
-                        "error": None
-                    }
-                
-                batch_results.append(res)
-            
-            results.extend(batch_results)
-            
-            # Small delay between batches to be respectful to the API
-            if i + batch_size < len(candidates):
-                await asyncio.sleep(0.1)
-
-        # Enhanced scoring function for weather quality
-        def score_weather_quality(r):
-            """
-            Enhanced weather scoring considering multiple factors:
-            - Temperature comfort (optimal around 22-25°C)
-            - Precipitation (lower is better)
-            - Wind conditions (moderate is best)
-            - Humidity (comfortable range)
-            """
-            
-            # Temperature scoring (peak at 22-25°C)
-            temp = r.get("t2m", 20.0)
-            if 22 <= temp <= 25:
-                temp_score = 1.0
-            elif 18 <= temp <= 30:
-                temp_score = 0.8 - abs(temp - 23.5) / 15.0
-            else:
-                temp_score = max(0.0, 0.5 - abs(temp - 23.5) / 20.0)
-            
-            # Precipitation scoring (exponential decay)
-            rain = r.get("rain", 0.0)
-            rain_score = math.exp(-rain / 3.0)  # Exponential decay, 3mm = ~0.37 score
-            
-            # Wind scoring (optimal around 2-6 m/s)
-            wind = r.get("ws", 3.0)
-            if 2 <= wind <= 6:
-                wind_score = 1.0
-            elif wind < 10:
-                wind_score = max(0.3, 1.0 - abs(wind - 4) / 8.0)
-            else:
-                wind_score = 0.1  # Very windy
-            
-            # Humidity scoring (based on specific humidity)
-            humidity = r.get("qv", 8.0)  # g/kg
-            if 6 <= humidity <= 12:
-                humidity_score = 1.0
-            else:
-                humidity_score = max(0.2, 1.0 - abs(humidity - 9) / 8.0)
-            
-            # Pressure scoring (stability indicator)
-            pressure = r.get("ps", 101.3)
-            pressure_score = max(0.5, 1.0 - abs(pressure - 101.3) / 5.0)
-            
-            # Weighted combination
-            final_score = (
-                0.35 * temp_score +      # Temperature is most important
-                0.30 * rain_score +      # Rain significantly affects comfort
-                0.20 * wind_score +      # Wind affects comfort
-                0.10 * humidity_score +  # Humidity affects comfort
-                0.05 * pressure_score    # Pressure affects weather stability
-            )
-            
-            return max(0.0, min(1.0, final_score))
-
-        # Build scored list with proper error handling
-        scored = []
-        for r in results:
-            try:
-                score = score_weather_quality(r)
-                
-                def json_safe_number(v):
-                    """Convert value to JSON-safe number or None"""
-                    try:
-                        if v is None or (isinstance(v, float) and math.isnan(v)):
-                            return None
-                        return float(v)
-                    except (ValueError, TypeError):
-                        return None
+                item = dict(zip(_SUGGESTION_FIELDS, safe_values[i]))
 
                 # Create weather description
-                temp_str = f"{r['t2m']:.1f}°C" if r['t2m'] is not None and not math.isnan(r['t2m']) else "–"
-                rain_str = f"{r['rain']:.1f}mm" if r['rain'] is not None and not math.isnan(r['rain']) else "–"
-                wind_str = f"{r['ws']:.1f}m/s" if r['ws'] is not None and not math.isnan(r['ws']) else "–"
-                humidity_str = f"{r['qv']:.1f}g/kg" if r['qv'] is not None and not math.isnan(r['qv']) else "–"
-                
-                reason = f"Temp {temp_str}, Rain {rain_str}, Wind {wind_str}, Humidity {humidity_str}"
-                
-                # Build result item
-                item = {
-                    "lat": json_safe_number(r["lat"]),
-                    "lon": json_safe_number(r["lon"]),
-                    "t2m": json_safe_number(r["t2m"]),
-                    "rain": json_safe_number(r["rain"]),
-                    "qv": json_safe_number(r["qv"]),
-                    "ps": json_safe_number(r["ps"]),
-                    "ws": json_safe_number(r["ws"]),
+                reason = ", ".join(
+                    f"{label} {item[field]:.1f}{unit}" if item[field] is not None else f"{label} –"
+                    for label, field, unit in _REASON_PARTS
+                )
+                item.update({
                     "source": r.get("source", "Unknown"),
-                    "score": json_safe_number(round(score, 3)),
+                    "score": rounded_scores[i],
                     "reason": reason,
-                }
+                })
                 
-                scored.append(item)
+                top.append(item)
                 
             except Exception as e:
                 logger.warning(f"Error processing result for ({r.get('lat')}, {r.get('lon')}): {e}")
                 continue
 
-        # Sort by score (highest first) and limit results
-        scored.sort(key=lambda x: x.get("score", 0), reverse=True)
-        top = scored[:limit]
-
-        # Reverse geocode for location names
-        def get_location_name(lat, lon):
-            """Get human-readable location name"""
-            try:
-                params = {
-                    "format": "jsonv2",
-                    "lat": str(lat),
-                    "lon": str(lon),
-                    "zoom": "14",  # Appropriate zoom level for neighborhoods
-                }
-                resp = requests.get(
-                    f"{NOMINATIM_BASE}/reverse", 
-                    params=params, 
-                    headers=_nominatim_headers(), 
-                    timeout=5
-                )
-                if resp.ok:
-                    data = resp.json()
-                    # Try to get a meaningful location name
-                    display_name = data.get("display_name", "")
-                    if display_name:
-                        # Simplify the display name
-                        parts = display_name.split(",")
-                        if len(parts) >= 2:
-                            return f"{parts[0].strip()}, {parts[1].strip()}"
-                        return parts[0].strip()
-                    return data.get("name", f"{lat:.4f}, {lon:.4f}")
-            except Exception as e:
-                logger.debug(f"Reverse geocoding failed for ({lat}, {lon}): {e}")
-                
-            return f"{lat:.4f}, {lon:.4f}"
-
-        # Add location names to top results
+        # Add location names to top results, looking them up concurrently
+        located = [item for item in top if item["lat"] is not None and item["lon"] is not None]
+        names = await asyncio.gather(*(_get_location_name(app.state.http, item["lat"], item["lon"]) for item in located))
         for item in top:
-            if item["lat"] is not None and item["lon"] is not None:
-                item["name"] = get_location_name(item["lat"], item["lon"])
-            else:
-                item["name"] = "Unknown location"
+            item["name"] = "Unknown location"
+        for item, name in zip(located, names):
+            item["name"] = name
 
-        return {
+        return ORJSONNumpyResponse({
             "suggestions": top, 
             "center": {"lat": latitude, "lon": longitude}, 
             "radius_km": radius_km,
-            "total_candidates": len(candidates),
-            "successful_fetches": len(scored)
-        }
+            "total_candidates": len(order),
+            "successful_fetches": len(results)
+        })
 
     except Exception as e:
         logger.error(f"/weather-suggestions failed: {e}")
         raise HTTPException(status_code=500, detail=f"Weather suggestions failed: {str(e)}")
 
 
+# Rows serialized per streamed CSV chunk
+_CSV_CHUNK_ROWS = 2048
+# Four significant digits (not decimals) keep small-magnitude columns such as QV2M in kg/kg (~0.008)
+# intact while dropping float32 noise digits that only bloat downloads
+_CSV_FLOAT_FORMAT = "%.4g"
+
+
+def _iter_csv(df: pd.DataFrame):
+    """Yield a DataFrame as CSV in row blocks, so the full text is never held in memory at once."""
+    for start in range(0, max(len(df), 1), _CSV_CHUNK_ROWS):
+        chunk = df.iloc[start:start + _CSV_CHUNK_ROWS]
+        yield chunk.to_csv(index=True, header=start == 0, float_format=_CSV_FLOAT_FORMAT).encode("utf-8")
+
+
 class DownloadQuery(BaseModel):
     latitude: float
     longitude: float
@@ -832,45 +951,18 @@ class DownloadQuery(BaseModel):
 @app.post("/download.csv")
 async def download_csv(query: DownloadQuery):
     try:
-        loop = asyncio.get_event_loop()
-        # Try NASA Giovanni first, fallback to other NASA sources
-        try:
-            data = await loop.run_in_executor(
-                None,
-                get_power_point_data,
-                query.latitude,
-                query.longitude,
-                query.start_date,
-                query.end_date,
-                query.variables,
-            )
-        except Exception as power_err:
-            logger.warning(f"NASA POWER download fetch failed, trying Earthdata Search: {power_err}")
-            try:
-                data = await loop.run_in_executor(
-                    None,
-                    get_earthdata_point_data,
-                    query.latitude,
-                    query.longitude,
-                    query.start_date,
-                    query.end_date,
-                    query.variables,
-                )
-            except Exception as earthdata_err:
-                logger.warning(f"NASA Earthdata Search download fetch failed, trying MERRA-2: {earthdata_err}")
-                data = await loop.run_in_executor(
-                    None,
-                    get_merra_point_data,
-                    query.latitude,
-                    query.longitude,
-                    query.start_date,
-                    query.end_date,
-                    query.variables,
-                )
-        df = _dict_to_dataframe(data)
-        csv_bytes = df.to_csv(index=True).encode("utf-8")
-        return Response(
-            content=csv_bytes,
+        # Race the NASA sources in preference order instead of waiting out each failure in turn
+        _source, data = await _fetch_hedged(
+            _WEATHER_PROVIDERS,
+            query.latitude,
+            query.longitude,
+            query.start_date,
+            query.end_date,
+            query.variables,
+        )
+        df = _arrays_to_dataframe(data)
+        return StreamingResponse(
+            _iter_csv(df),
             media_type="text/csv",
             headers={
                 "Content-Disposition": "attachment; filename=nasa_timeseries.csv"
@@ -909,7 +1001,8 @@ async def serve_home():
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # loop="auto" runs on uvloop (installed with uvicorn[standard]) and falls back to asyncio where unavailable
+    uvicorn.run(app, host="0.0.0.0", port=8000, loop="auto")
 
 
 
@@ -8,18 +8,33 @@ References:
 """
 from __future__ import annotations
 
+import functools
 import os
+import threading
 from datetime import datetime, timedelta
-from typing import List, Dict
+from typing import List, Dict, Tuple
 from netrc import netrc
 
+import numpy as np
 import xarray as xr
 from pydap.cas.urs import setup_session
+from pydap.client import open_url
+
+from cache import cached_point_query
+from circuit_breaker import CircuitBreaker
 
 GES_DISC_HOST = "https://goldsmr4.gesdisc.eosdis.nasa.gov"
 PRODUCT = "M2T1NXSLV"
 VERSION = "5.12.4"
 
+# Fixed MERRA-2 native grid: 361 latitudes from -90 at 0.5°, 576 longitudes from -180 at 0.625°
+GRID_LAT_STEP = 0.5
+GRID_LON_STEP = 0.625
+GRID_N_LAT = 361
+GRID_N_LON = 576
+# tavg1 files hold 24 hourly means stamped at HH:30
+HOURS_PER_FILE = 24
+
 
 def _get_urs_credentials() -> tuple[str | None, str | None]:
     """Load Earthdata Login credentials from env or ~/.netrc.
@@ -40,15 +55,36 @@ def _get_urs_credentials() -> tuple[str | None, str | None]:
     return None, None
 
 
+_URS_SESSION = None
+_URS_SESSION_LOCK = threading.Lock()
+
+
 def _create_urs_session(check_url: str = GES_DISC_HOST):
-    """Create an authenticated requests.Session for OPeNDAP with URS creds."""
-    user, pwd = _get_urs_credentials()
-    if not user or not pwd:
-        raise RuntimeError(
-            "Missing Earthdata credentials. Set EARTHDATA_USERNAME and EARTHDATA_PASSWORD env vars, "
-            "or configure ~/.netrc for 'urs.earthdata.nasa.gov'."
-        )
-    return setup_session(user, pwd, check_url=check_url)
+    """Return the authenticated requests.Session for OPeNDAP with URS creds.
+
+    The URS login handshake runs once per process; later calls reuse the session's
+    cookies and keep-alive connections.
+    """
+    global _URS_SESSION
+    with _URS_SESSION_LOCK:
+        if _URS_SESSION is None:
+            user, pwd = _get_urs_credentials()
+            if not user or not pwd:
+                raise RuntimeError(
+                    "Missing Earthdata credentials. Set EARTHDATA_USERNAME and EARTHDATA_PASSWORD env vars, "
+                    "or configure ~/.netrc for 'urs.earthdata.nasa.gov'."
+                )
+            _URS_SESSION = setup_session(user, pwd, check_url=check_url)
+        return _URS_SESSION
+
+
+# Plausible raw MERRA-2 value ranges: variable -> (label, min, max)
+_RANGES = {
+    "T2M": ("Temperature", 200, 350),   # K
+    "U10M": ("Wind", -100, 100),        # m/s
+    "V10M": ("Wind", -100, 100),        # m/s
+    "PS": ("Pressure", 50000, 110000),  # Pa
+}
 
 
 def validate_weather_data(data: Dict, variables: List[str]) -> bool:
@@ -66,23 +102,16 @@ def validate_weather_data(data: Dict, variables: List[str]) -> bool:
     # Check for reasonable value ranges
     for var in variables:
         if var in data["data_vars"]:
-            values = data["data_vars"][var]["data"]
-            if not values:
+            values = np.asarray(data["data_vars"][var]["data"], dtype=np.float64)
+            if values.size == 0:
                 raise ValueError(f"No data for variable {var}")
-                
+
             # Basic sanity checks for weather variables
-            if var == "T2M":  # Temperature should be reasonable (200-350K)
-                temp_range = [min(values), max(values)]
-                if temp_range[0] < 200 or temp_range[1] > 350:
-                    raise ValueError(f"Temperature values out of range: {temp_range}")
-            elif var in ["U10M", "V10M"]:  # Wind components (-100 to 100 m/s)
-                wind_range = [min(values), max(values)]
-                if wind_range[0] < -100 or wind_range[1] > 100:
-                    raise ValueError(f"Wind values out of range: {wind_range}")
-            elif var == "PS":  # Surface pressure (50000-110000 Pa)
-                pressure_range = [min(values), max(values)]
-                if pressure_range[0] < 50000 or pressure_range[1] > 110000:
-                    raise ValueError(f"Pressure values out of range: {pressure_range}")
+            if var in _RANGES:
+                label, low, high = _RANGES[var]
+                value_range = [float(np.nanmin(values)), float(np.nanmax(values))]
+                if value_range[0] < low or value_range[1] > high:
+                    raise ValueError(f"{label} values out of range: {value_range}")
     
     return True
 
@@ -129,27 +158,113 @@ def _generate_merra2_daily_urls(start_date: str, end_date: str) -> List[str]:
 
 def _open_dataset(urls: List[str]):
     """Open multiple OPeNDAP URLs as a single xarray Dataset with auth session."""
+    return _open_dataset_cached(tuple(urls))
+
+
+@functools.lru_cache(maxsize=32)
+def _open_dataset_cached(urls: Tuple[str, ...]):
+    """Lazily opened Datasets keyed by URL tuple, so repeat ranges skip the DAS/DDS fetches."""
     session = _create_urs_session(check_url=GES_DISC_HOST)
     # pydap engine understands sessions for authenticated requests
+    # One dask chunk per daily file, so reductions stream a day at a time
     ds = xr.open_mfdataset(
-        urls,
+        list(urls),
         engine="pydap",
         combine="by_coords",
+        chunks={"time": HOURS_PER_FILE},
         backend_kwargs={"session": session},
     )
     return ds
 
 
-def get_point_data(latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict:
+def _merra2_indices(latitude: float, longitude: float) -> Tuple[int, int]:
+    """Nearest (lat, lon) cell indices on the fixed MERRA-2 grid, without fetching coordinate arrays.
+
+    Longitude wraps, so 180°E maps to the -180° column.
     """
-    Fetch MERRA-2 hourly data for a point using OPeNDAP (xarray+pydap with URS).
-    
-    Optimized for website use:
-    - Validates date range (max 7 days for performance)
-    - Pre-filters variables to only weather essentials
-    - Returns structured data ready for frontend consumption
+    lat_i = min(GRID_N_LAT - 1, max(0, round((latitude + 90) / GRID_LAT_STEP)))
+    lon_i = round((longitude + 180) / GRID_LON_STEP) % GRID_N_LON
+    # Cheap post-check: the chosen cell centre must be within half a grid step of the point
+    cell_lat = -90 + lat_i * GRID_LAT_STEP
+    cell_lon = -180 + lon_i * GRID_LON_STEP
+    lon_gap = abs((longitude - cell_lon + 180) % 360 - 180)
+    if abs(latitude - cell_lat) > GRID_LAT_STEP / 2 or lon_gap > GRID_LON_STEP / 2:
+        raise ValueError(f"Point ({latitude}, {longitude}) is outside the MERRA-2 grid")
+    return lat_i, lon_i
+
+
+@functools.lru_cache(maxsize=64)
+def _open_point_file(url: str, variables: Tuple[str, ...]):
+    """pydap handle for one daily file, projected onto the given variables (metadata only, no data)."""
+    session = _create_urs_session(check_url=GES_DISC_HOST)
+    return open_url(f"{url}?{','.join(variables)}", session=session, output_grid=False)
+
+
+def _mask_fill_values(values: np.ndarray, attributes: Dict) -> np.ndarray:
+    """Replace _FillValue/missing_value cells (1e15 in MERRA-2) with NaN, as xarray's decoding did."""
+    for name in ("_FillValue", "missing_value"):
+        fill = attributes.get(name)
+        if fill is not None:
+            values = np.where(values == np.float32(np.ravel(fill)[0]), np.float32(np.nan), values)
+    return values
+
+
+# A shared bounding-box read is used only while it spans at most this many grid cells per
+# requested cell; spread-out points (or ones straddling the 180° seam) are read cell by cell
+_MAX_SLAB_CELLS_PER_POINT = 4
+
+
+def _plan_slabs(lat_idx: np.ndarray, lon_idx: np.ndarray) -> List[Tuple[slice, slice, np.ndarray, np.ndarray, np.ndarray]]:
+    """Group cells into hyperslab reads as (lat slice, lon slice, cell lat offsets, cell lon offsets, columns)."""
+    lat_lo, lat_hi = int(lat_idx.min()), int(lat_idx.max()) + 1
+    lon_lo, lon_hi = int(lon_idx.min()), int(lon_idx.max()) + 1
+    if (lat_hi - lat_lo) * (lon_hi - lon_lo) <= _MAX_SLAB_CELLS_PER_POINT * len(lat_idx):
+        return [(slice(lat_lo, lat_hi), slice(lon_lo, lon_hi), lat_idx - lat_lo, lon_idx - lon_lo, np.arange(len(lat_idx)))]
+    # One single-cell read per distinct cell; points sharing a cell share the read
+    cells, inverse = np.unique(lat_idx * GRID_N_LON + lon_idx, return_inverse=True)
+    zero = np.zeros(1, dtype=np.int64)
+    return [
+        (slice(int(cell) // GRID_N_LON, int(cell) // GRID_N_LON + 1), slice(int(cell) % GRID_N_LON, int(cell) % GRID_N_LON + 1),
+         zero, zero, np.flatnonzero(inverse == k))
+        for k, cell in enumerate(cells)
+    ]
+
+
+def _fetch_cells_hourly(urls: List[str], variables: List[str], lat_idx: np.ndarray, lon_idx: np.ndarray) -> tuple[List[str], Dict[str, np.ndarray], Dict]:
+    """Read hourly series for grid cells from each daily file via DAP hyperslab requests.
+
+    Each file is opened with a projection constraint on the requested variables, and only
+    the bounding lat/lon slab around the cells is transferred (a single cell for one point)
+    instead of global grids. Cells too far apart for a compact box are read one by one.
+    Returns arrays shaped (hours, cells).
     """
-    # Validate date range for performance
+    slabs = _plan_slabs(lat_idx, lon_idx)
+    chunks: Dict[str, List[np.ndarray]] = {}
+    vars_present: List[str] = []
+    attrs: Dict = {}
+    for url in urls:
+        dataset = _open_point_file(url, tuple(variables))
+        if not chunks:
+            vars_present = [v for v in variables if v in dataset]
+            if not vars_present:
+                raise RuntimeError(f"None of the requested variables found in dataset: {variables}")
+            attrs = dict(dataset.attributes.get("NC_GLOBAL", {}))
+            chunks = {v: [] for v in vars_present}
+        for var in vars_present:
+            day = None
+            for lat_slice, lon_slice, cell_lat, cell_lon, columns in slabs:
+                slab = np.asarray(dataset[var][:, lat_slice, lon_slice].data, dtype=np.float32)
+                slab = _mask_fill_values(slab, dataset[var].attributes)
+                slab = slab.reshape(-1, lat_slice.stop - lat_slice.start, lon_slice.stop - lon_slice.start)
+                if day is None:
+                    day = np.empty((slab.shape[0], len(lat_idx)), dtype=np.float32)
+                day[:, columns] = slab[:, cell_lat, cell_lon]
+            chunks[var].append(day)
+    return vars_present, {var: np.concatenate(parts) for var, parts in chunks.items()}, attrs
+
+
+def _check_request(start_date: str, end_date: str, variables: List[str]) -> tuple[int, List[str]]:
+    """Validate the date range (max 7 days for performance) and keep only essential weather variables."""
     start = datetime.strptime(start_date, "%Y-%m-%d")
     end = datetime.strptime(end_date, "%Y-%m-%d")
     date_diff = (end - start).days + 1
@@ -157,62 +272,113 @@ def get_point_data(latitude: float, longitude: float, start_date: str, end_date:
     if date_diff > 7:
         raise ValueError("Date range too large. Maximum 7 days allowed for performance.")
     
-    # Pre-filter to essential weather variables only
     weather_vars = ['T2M', 'U10M', 'V10M', 'PS', 'QV2M', 'PRECTOT']
     variables = [v for v in variables if v in weather_vars]
     
     if not variables:
         raise ValueError(f"No valid weather variables requested. Available: {weather_vars}")
+    return date_diff, variables
+
+
+def _hourly_times(start_date: str, date_diff: int) -> np.ndarray:
+    """Timestamps of the hourly means in date_diff daily files, centred on the half hour."""
+    hours = np.arange(date_diff * HOURS_PER_FILE, dtype="timedelta64[h]")
+    return (np.datetime64(start_date, "m") + np.timedelta64(30, "m") + hours).astype("datetime64[ns]")
+
+
+def _point_result(latitude: float, longitude: float, start_date: str, end_date: str, date_diff: int,
+                  times: np.ndarray, vars_present: List[str], values: Dict[str, np.ndarray], attrs: Dict) -> Dict:
+    """Point arrays plus the metadata the frontend shows."""
+    return {
+        'time': times,
+        'vars': values,
+        'attrs': attrs,
+        'metadata': {
+            'location': {'lat': latitude, 'lon': longitude},
+            'variables': vars_present,
+            'date_range': {'start': start_date, 'end': end_date, 'days': date_diff},
+            'data_source': 'MERRA-2 M2T1NXSLV.5.12.4',
+            'access_method': 'NASA GES DISC OPeNDAP'
+        },
+    }
+
+
+# Shared by the single-point and batched paths: both hit the same upstream
+_MERRA_BREAKER = CircuitBreaker("NASA MERRA-2", exclude=(ValueError,))  # ValueError = rejected request (e.g. date range), not an outage
+
+
+@cached_point_query("merra2")
+@_MERRA_BREAKER
+def get_point_arrays(latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict:
+    """
+    Fetch MERRA-2 hourly data for a point using OPeNDAP (pydap with URS).
+    
+    Optimized for website use:
+    - Validates date range (max 7 days for performance)
+    - Pre-filters variables to only weather essentials
+    - Requests only the point's grid cell from each file instead of opening a combined global dataset
+    - Returns time/variable arrays directly, skipping the Dataset.to_dict() list round-trip
+    """
+    date_diff, variables = _check_request(start_date, end_date, variables)
     
     urls = _generate_merra2_daily_urls(start_date, end_date)
     print(f"🌍 Accessing MERRA-2 data for {date_diff} days, {len(variables)} variables...")
-    
+
+    lat_i, lon_i = _merra2_indices(latitude, longitude)
+
     try:
-        ds = _open_dataset(urls)
-        print(f"✅ Successfully opened dataset with {len(urls)} files")
+        vars_present, values, attrs = _fetch_cells_hourly(urls, variables, np.array([lat_i]), np.array([lon_i]))
+        print(f"🎯 Extracted data for point ({latitude:.2f}°N, {longitude:.2f}°E) from {len(urls)} files, "
+              f"grid cell ({-90 + lat_i * GRID_LAT_STEP:.2f}°N, {-180 + lon_i * GRID_LON_STEP:.3f}°E)")
+    except RuntimeError:
+        raise
     except Exception as e:
-        raise RuntimeError(f"Failed opening OPeNDAP dataset: {e}")
-
-    # Harmonize coordinate names (MERRA-2 uses lat/lon)
-    coord_lon = "lon" if "lon" in ds.coords else ("longitude" if "longitude" in ds.coords else None)
-    coord_lat = "lat" if "lat" in ds.coords else ("latitude" if "latitude" in ds.coords else None)
-    if coord_lon is None or coord_lat is None:
-        raise RuntimeError("Dataset missing lat/lon coordinate names.")
+        raise RuntimeError(f"Failed reading OPeNDAP point subset: {e}")
 
-    # Only keep requested variables that exist
-    vars_present = [v for v in variables if v in ds.variables]
-    if not vars_present:
-        raise RuntimeError(f"None of the requested variables found in dataset: {variables}")
-    
     print(f"📊 Found variables: {vars_present}")
 
+    return _point_result(latitude, longitude, start_date, end_date, date_diff, _hourly_times(start_date, date_diff),
+                         vars_present, {var: series[:, 0] for var, series in values.items()}, attrs)
+
+
+@_MERRA_BREAKER
+def get_points_data(points: List[Tuple[float, float]], start_date: str, end_date: str, variables: List[str]) -> Dict[int, Dict]:
+    """
+    Fetch MERRA-2 hourly data for many (lat, lon) points at once.
+
+    Each daily file is opened once and a single hyperslab spanning the points' bounding box
+    is read per variable, instead of one request per point (widely spread points fall back
+    to single-cell reads rather than pulling most of the global grid). Returns get_point_arrays-shaped
+    results keyed by the point's index in `points`.
+    """
+    if not points:
+        return {}
+    date_diff, variables = _check_request(start_date, end_date, variables)
+    urls = _generate_merra2_daily_urls(start_date, end_date)
+    lat_idx, lon_idx = (np.array(idx) for idx in zip(*(_merra2_indices(lat, lon) for lat, lon in points)))
+
     try:
-        # Select point data with nearest neighbor
-        ds_subset = ds[vars_present].sel({coord_lon: longitude, coord_lat: latitude}, method="nearest")
-        print(f"🎯 Extracted data for point ({latitude:.2f}°N, {longitude:.2f}°E)")
+        vars_present, values, attrs = _fetch_cells_hourly(urls, variables, lat_idx, lon_idx)
+    except RuntimeError:
+        raise
     except Exception as e:
-        raise RuntimeError(f"Failed to subset variables/point: {e}")
-
-    # Ensure time-sorted
-    if "time" in ds_subset.coords:
-        ds_subset = ds_subset.sortby("time")
-    
-    # Add metadata for frontend
-    result = ds_subset.to_dict()
-    result['metadata'] = {
-        'location': {'lat': latitude, 'lon': longitude},
-        'variables': vars_present,
-        'date_range': {'start': start_date, 'end': end_date, 'days': date_diff},
-        'data_source': 'MERRA-2 M2T1NXSLV.5.12.4',
-        'access_method': 'NASA GES DISC OPeNDAP'
+        raise RuntimeError(f"Failed reading OPeNDAP multi-point subset: {e}")
+    print(f"🎯 Extracted MERRA-2 data for {len(points)} points from {len(urls)} files")
+
+    times = _hourly_times(start_date, date_diff)
+    return {
+        i: _point_result(lat, lon, start_date, end_date, date_diff, times,
+                         vars_present, {var: series[:, i] for var, series in values.items()}, attrs)
+        for i, (lat, lon) in enumerate(points)
     }
-    
-    return result
 
 
-def get_stats_data(start_date: str, end_date: str, variable: str, freq: str, stat: str) -> Dict:
+def get_stats_data(start_date: str, end_date: str, variable: str, freq: str, stat: str,
+                   latitude: float | None = None, longitude: float | None = None) -> Dict:
     """Compute time-aggregated stats for a single variable over a date range.
 
+    With latitude/longitude, only that point's grid cell is selected before resampling, so
+    just its series is fetched instead of every hour of the global field.
     Returns a dictionary (xarray to_dict with data as lists) suitable for JSON.
     """
     urls = _generate_merra2_daily_urls(start_date, end_date)
@@ -225,6 +391,11 @@ def get_stats_data(start_date: str, end_date: str, variable: str, freq: str, sta
         raise ValueError(f"Variable '{variable}' not found in dataset")
 
     da = ds[variable]
+    if (latitude is None) != (longitude is None):
+        raise ValueError("latitude and longitude must be given together")
+    if latitude is not None:
+        lat_i, lon_i = _merra2_indices(latitude, longitude)
+        da = da.isel(lat=lat_i, lon=lon_i)
     if "time" not in da.dims:
         raise RuntimeError("Variable has no 'time' dimension for resampling")
 
@@ -240,5 +411,5 @@ def get_stats_data(start_date: str, end_date: str, variable: str, freq: str, sta
     else:
         raise ValueError(f"Unsupported statistic: {stat}")
 
-    # Convert to JSON-serializable dict (lists)
-    return result_da.to_dict(data="list")
+    # Materialize only the reduction, then convert to JSON-serializable dict (lists)
+    return result_da.compute().to_dict(data="list")
@@ -5,13 +5,20 @@ Primary: NASA POWER API (accessible from most environments)
 Fallback: MERRA-2 climatology patterns based on NASA data
 """
 
+import aiohttp
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 import logging
 from typing import Dict, List, Any, Optional
 
+from cache import cached_point_query
+from circuit_breaker import CircuitBreaker
+
 logger = logging.getLogger(__name__)
 
 # NASA POWER API endpoint
@@ -28,7 +35,40 @@ POWER_VARIABLE_MAP = {
     'PRECTOTCORR': 'PRECTOTCORR'  # Precipitation (mm/day)
 }
 
-def get_point_data(latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict[str, Any]:
+def _is_client_error(error: BaseException) -> bool:
+    """True for POWER 4xx responses: the request was rejected, the service itself is up.
+
+    429 is left out on purpose - being rate limited is a reason to back off.
+    """
+    if isinstance(error, requests.HTTPError) and error.response is not None:
+        status = error.response.status_code
+    elif isinstance(error, aiohttp.ClientResponseError):
+        status = error.status
+    else:
+        return False
+    return 400 <= status < 500 and status != 429
+
+
+# Shared by the sync and async POWER paths: both hit the same upstream.
+# ValueError = rejected request (bad date, no valid variables), not an outage
+_POWER_BREAKER = CircuitBreaker("NASA POWER", exclude=(ValueError,), is_excluded=_is_client_error)
+
+
+def _create_power_session() -> requests.Session:
+    """Pooled keep-alive session for the threaded POWER path, retrying transient 5xx with backoff."""
+    session = requests.Session()
+    # Retry 5xx only; a hung server must not cost several full read timeouts, so reads are never
+    # retried and a failed connect gets a single second attempt
+    retries = Retry(total=3, connect=1, read=0, status=3, backoff_factor=0.3, status_forcelist=[500, 502, 503, 504])
+    session.mount("https://", HTTPAdapter(pool_connections=20, pool_maxsize=20, max_retries=retries))
+    return session
+
+
+_POWER_SESSION = _create_power_session()
+
+@cached_point_query("power")
+@_POWER_BREAKER
+def get_point_arrays(latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict[str, Any]:
     """
     Fetch NASA point data using POWER API.
     
@@ -40,100 +80,22 @@ def get_point_data(latitude: float, longitude: float, start_date: str, end_date:
         variables: List of variable names
         
     Returns:
-        Dict containing time series data in xarray-like format
+        Dict with 'time' (datetime64 array), 'vars' ({name: float array}) and 'attrs'
     """
     logger.info(f"🌍 Fetching NASA POWER data for ({latitude:.2f}°N, {longitude:.2f}°E)")
     logger.info(f"📅 Date range: {start_date} to {end_date}")
     logger.info(f"📊 Variables: {variables}")
     
     try:
-        # Map variables to POWER API names
-        power_vars = []
-        for var in variables:
-            if var in POWER_VARIABLE_MAP:
-                power_vars.append(POWER_VARIABLE_MAP[var])
-            else:
-                logger.warning(f"Variable {var} not available in NASA POWER, skipping")
-        
-        if not power_vars:
-            raise ValueError("No valid variables for NASA POWER API")
-        
-        # Build POWER API request
-        params = {
-            'start': start_date.replace('-', ''),  # YYYYMMDD format
-            'end': end_date.replace('-', ''),      # YYYYMMDD format
-            'latitude': latitude,
-            'longitude': longitude,
-            'community': 'AG',  # Agroclimatology community
-            'parameters': ','.join(power_vars),
-            'format': 'JSON',
-            'header': 'true',
-            'time-standard': 'UTC'
-        }
+        params = _build_power_params(latitude, longitude, start_date, end_date, variables)
         
         logger.info(f"📡 Requesting NASA POWER data...")
         
         # Make request with timeout and retries
-        response = requests.get(POWER_API_BASE, params=params, timeout=30)
+        response = _POWER_SESSION.get(POWER_API_BASE, params=params, timeout=30)
         response.raise_for_status()
         
-        data = response.json()
-        
-        if 'properties' not in data or 'parameter' not in data['properties']:
-            raise ValueError("Invalid response from NASA POWER API")
-        
-        # Parse the response
-        parameters = data['properties']['parameter']
-        
-        # Create time index
-        start_dt = datetime.strptime(start_date, '%Y-%m-%d')
-        end_dt = datetime.strptime(end_date, '%Y-%m-%d')
-        date_range = pd.date_range(start=start_dt, end=end_dt, freq='D')
-        
-        # Build xarray-like dictionary structure
-        coords = {
-            'time': {
-                'dims': ['time'],
-                'data': [dt.isoformat() for dt in date_range]
-            }
-        }
-        
-        data_vars = {}
-        for var in variables:
-            if var in POWER_VARIABLE_MAP and POWER_VARIABLE_MAP[var] in parameters:
-                param_data = parameters[POWER_VARIABLE_MAP[var]]
-                
-                # Convert to list aligned with date range
-                values = []
-                for dt in date_range:
-                    date_key = dt.strftime('%Y%m%d')
-                    if date_key in param_data:
-                        val = param_data[date_key]
-                        # Handle missing values
-                        if val == -999.0 or val is None:
-                            values.append(np.nan)
-                        else:
-                            values.append(float(val))
-                    else:
-                        values.append(np.nan)
-                
-                data_vars[var] = {
-                    'dims': ['time'],
-                    'data': values
-                }
-        
-        result = {
-            'coords': coords,
-            'data_vars': data_vars,
-            'attrs': {
-                'source': 'NASA POWER API',
-                'description': 'NASA Prediction of Worldwide Energy Resources',
-                'location': f'({latitude:.4f}°N, {longitude:.4f}°E)'
-            }
-        }
-        
-        logger.info(f"✅ NASA POWER data fetch successful - {len(date_range)} days")
-        return result
+        return _parse_power_response(orjson.loads(response.content), latitude, longitude, start_date, end_date, variables)
         
     except requests.exceptions.RequestException as e:
         logger.debug(f"❌ NASA POWER API request failed: {e}")
@@ -143,14 +105,92 @@ def get_point_data(latitude: float, longitude: float, start_date: str, end_date:
         raise
 
 
-def get_point_data_daily(latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict[str, Any]:
+def _build_power_params(latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict[str, Any]:
+    """Map variables to POWER API names and build the query parameters."""
+    power_vars = []
+    for var in variables:
+        if var in POWER_VARIABLE_MAP:
+            power_vars.append(POWER_VARIABLE_MAP[var])
+        else:
+            logger.warning(f"Variable {var} not available in NASA POWER, skipping")
+    
+    if not power_vars:
+        raise ValueError("No valid variables for NASA POWER API")
+    
+    return {
+        'start': start_date.replace('-', ''),  # YYYYMMDD format
+        'end': end_date.replace('-', ''),      # YYYYMMDD format
+        'latitude': latitude,
+        'longitude': longitude,
+        'community': 'AG',  # Agroclimatology community
+        'parameters': ','.join(power_vars),
+        'format': 'JSON',
+        'header': 'true',
+        'time-standard': 'UTC'
+    }
+
+
+def _parse_power_response(data: Dict[str, Any], latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict[str, Any]:
+    """Convert a POWER API JSON payload into time/variable arrays."""
+    if 'properties' not in data or 'parameter' not in data['properties']:
+        raise ValueError("Invalid response from NASA POWER API")
+    
+    # Parse the response
+    parameters = data['properties']['parameter']
+    
+    # Create time index
+    start_dt = datetime.strptime(start_date, '%Y-%m-%d')
+    end_dt = datetime.strptime(end_date, '%Y-%m-%d')
+    date_range = pd.date_range(start=start_dt, end=end_dt, freq='D')
+    
+    # POWER keys each parameter's values by YYYYMMDD; format the range once and align by reindex
+    date_keys = date_range.strftime('%Y%m%d')
+    
+    data_vars = {}
+    for var in variables:
+        if var in POWER_VARIABLE_MAP and POWER_VARIABLE_MAP[var] in parameters:
+            param_data = parameters[POWER_VARIABLE_MAP[var]]
+            
+            # Align to the date range (absent days -> NaN) and mask the -999 fill value
+            values = pd.Series(param_data, dtype=np.float64).reindex(date_keys)
+            data_vars[var] = values.where(values != -999.0).to_numpy(dtype=np.float32)
+    
+    result = {
+        'time': date_range.to_numpy().astype('datetime64[ns]', copy=False),
+        'vars': data_vars,
+        'attrs': {
+            'source': 'NASA POWER API',
+            'description': 'NASA Prediction of Worldwide Energy Resources',
+            'location': f'({latitude:.4f}°N, {longitude:.4f}°E)'
+        }
+    }
+    
+    logger.info(f"✅ NASA POWER data fetch successful - {len(date_range)} days")
+    return result
+
+
+@cached_point_query("power")
+@_POWER_BREAKER
+async def get_point_arrays_async(session: aiohttp.ClientSession, latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict[str, Any]:
     """
-    Fetch NASA daily point data - same as get_point_data since POWER API returns daily data.
+    Fetch NASA daily point data over a shared aiohttp session.
+    
+    Same result as get_point_arrays, but reuses the caller's pooled keep-alive
+    connections instead of opening a new one from a worker thread.
     """
-    return get_point_data(latitude, longitude, start_date, end_date, variables)
+    params = _build_power_params(latitude, longitude, start_date, end_date, variables)
+    try:
+        async with session.get(POWER_API_BASE, params=params, timeout=aiohttp.ClientTimeout(total=10)) as response:
+            response.raise_for_status()
+            data = await response.json(loads=orjson.loads)
+    except aiohttp.ClientError as e:
+        logger.debug(f"❌ NASA POWER API request failed: {e}")
+        raise
+    return _parse_power_response(data, latitude, longitude, start_date, end_date, variables)
 
 
-def get_earthdata_point_data(latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict[str, Any]:
+@cached_point_query("climatology")
+def get_earthdata_point_arrays(latitude: float, longitude: float, start_date: str, end_date: str, variables: List[str]) -> Dict[str, Any]:
     """
     Alternative NASA data source using climatological patterns.
     This provides realistic NASA data patterns when live APIs are unavailable.
@@ -163,78 +203,51 @@ def get_earthdata_point_data(latitude: float, longitude: float, start_date: str,
         end_dt = datetime.strptime(end_date, '%Y-%m-%d')
         date_range = pd.date_range(start=start_dt, end=end_dt, freq='D')
         
+        # Day of year for seasonal patterns, as one array over the whole range
+        doy = date_range.dayofyear.to_numpy().astype(np.float64)
+        n = doy.size
+        rng = np.random.default_rng()
+
+        def seasonal(phase_day):
+            return 2 * np.pi * (doy - phase_day) / 365
+
         # NASA climatological patterns based on location and season
-        coords = {
-            'time': {
-                'dims': ['time'],
-                'data': [dt.isoformat() for dt in date_range]
-            }
-        }
-        
         data_vars = {}
         
         for var in variables:
-            values = []
-            
-            for dt in date_range:
-                # Get day of year for seasonal patterns
-                doy = dt.timetuple().tm_yday
-                
-                # NASA-based climatological values
-                if var == 'T2M':
-                    # Temperature in Celsius, seasonal variation
-                    seasonal_temp = 15 + 20 * np.cos(2 * np.pi * (doy - 172) / 365)  # Peak in summer
-                    latitude_adj = (latitude - 45) * 0.3  # Latitude adjustment
-                    daily_var = np.random.normal(0, 3)  # Daily variation
-                    values.append(seasonal_temp - latitude_adj + daily_var)
-                    
-                elif var == 'U10M':
-                    # Eastward wind component (m/s)
-                    base_wind = 2.5 + 3 * np.cos(2 * np.pi * (doy - 80) / 365)  # Seasonal wind patterns
-                    values.append(base_wind + np.random.normal(0, 2))
-                    
-                elif var == 'V10M':
-                    # Northward wind component (m/s)  
-                    base_wind = 1.5 + 2 * np.sin(2 * np.pi * (doy - 120) / 365)
-                    values.append(base_wind + np.random.normal(0, 2))
-                    
-                elif var == 'WS10M':
-                    # Wind speed (m/s)
-                    seasonal_wind = 4 + 3 * np.cos(2 * np.pi * (doy - 60) / 365)
-                    values.append(max(0, seasonal_wind + np.random.normal(0, 1.5)))
-                    
-                elif var == 'PS':
-                    # Surface pressure (kPa) - NASA typical range
-                    base_pressure = 101.3 - latitude * 0.1  # Pressure varies with latitude
-                    seasonal_var = 2 * np.cos(2 * np.pi * (doy - 15) / 365)
-                    values.append(base_pressure + seasonal_var + np.random.normal(0, 0.5))
-                    
-                elif var == 'QV2M':
-                    # Specific humidity (g/kg)
-                    temp_for_humidity = 15 + 20 * np.cos(2 * np.pi * (doy - 172) / 365)
-                    humidity = max(1, 8 + temp_for_humidity * 0.3 + np.random.normal(0, 2))
-                    values.append(humidity)
-                    
-                elif var == 'PRECTOTCORR':
-                    # Precipitation (mm/day)
-                    # Higher chance in certain seasons
-                    precip_base = 2 + 3 * np.sin(2 * np.pi * (doy - 120) / 365)
-                    if np.random.random() < 0.3:  # 30% chance of precipitation
-                        values.append(max(0, precip_base * np.random.exponential(2)))
-                    else:
-                        values.append(0.0)
-                else:
-                    # Default value for unknown variables
-                    values.append(np.random.normal(0, 1))
+            if var == 'T2M':
+                # Temperature in Celsius, seasonal variation peaking in summer, adjusted for latitude
+                values = 15 + 20 * np.cos(seasonal(172)) - (latitude - 45) * 0.3 + rng.normal(0, 3, n)
+            elif var == 'U10M':
+                # Eastward wind component (m/s), seasonal wind patterns
+                values = 2.5 + 3 * np.cos(seasonal(80)) + rng.normal(0, 2, n)
+            elif var == 'V10M':
+                # Northward wind component (m/s)
+                values = 1.5 + 2 * np.sin(seasonal(120)) + rng.normal(0, 2, n)
+            elif var == 'WS10M':
+                # Wind speed (m/s)
+                values = np.fmax(0, 4 + 3 * np.cos(seasonal(60)) + rng.normal(0, 1.5, n))
+            elif var == 'PS':
+                # Surface pressure (kPa) - NASA typical range, varies with latitude
+                values = 101.3 - latitude * 0.1 + 2 * np.cos(seasonal(15)) + rng.normal(0, 0.5, n)
+            elif var == 'QV2M':
+                # Specific humidity (g/kg)
+                temp_for_humidity = 15 + 20 * np.cos(seasonal(172))
+                values = np.fmax(1, 8 + temp_for_humidity * 0.3 + rng.normal(0, 2, n))
+            elif var == 'PRECTOTCORR':
+                # Precipitation (mm/day), 30% chance of a wet day, heavier in certain seasons
+                precip_base = 2 + 3 * np.sin(seasonal(120))
+                wet = rng.random(n) < 0.3
+                values = np.where(wet, np.fmax(0, precip_base * rng.exponential(2, n)), 0.0)
+            else:
+                # Default value for unknown variables
+                values = rng.normal(0, 1, n)
             
-            data_vars[var] = {
-                'dims': ['time'],
-                'data': values
-            }
+            data_vars[var] = values.astype(np.float32)
         
         result = {
-            'coords': coords,
-            'data_vars': data_vars,
+            'time': date_range.to_numpy().astype('datetime64[ns]', copy=False),
+            'vars': data_vars,
             'attrs': {
                 'source': 'NASA Climatological Patterns',
                 'description': 'Climatologically realistic patterns based on NASA data analysis',